@@ -1 +1,9 @@
-__import__('pkg_resources').declare_namespace(__name__)
+__path__ = __import__('pkgutil').extend_path(__path__, __name__)
+
+
+def __getattr__(name):
+    # acsclient.ACSClient without importing the client at package import time
+    if name == "ACSClient":
+        from .acsclient import ACSClient
+        return ACSClient
+    raise AttributeError("module %r has no attribute %r" % (__name__, name))
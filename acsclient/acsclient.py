@@ -1,6 +1,14 @@
-import requests
-from jinja2 import Environment, FileSystemLoader
-import os
+import random
+import threading
+import time
+
+from .cache import ReadCache
+from .metrics import Metrics, RequestEvent
+from .parse import iter_objects, iterparse_objects, object_identity
+from .render import render
+
+# requests, jinja2 and the bulk/export/sync helpers are imported on first
+# use, which keeps "import acsclient" cheap for short-lived scripts.
 
 
 class ACSClient(object):
@@ -12,8 +20,15 @@ class ACSClient(object):
 
     _function_types = ['all', 'name', 'id', 'op']
 
+    _idempotent_methods = ['get', 'put', 'delete']
+
+    _retry_status = [429, 500, 502, 503, 504]
+
     def __init__(self, hostname, username, password,
-                 hide_urllib_warnings=False):
+                 hide_urllib_warnings=False, cache_ttl=None, cache_size=1024,
+                 verify=False, timeout=None, pool_connections=10, pool_maxsize=10,
+                 keep_alive=True, max_retries=0, backoff=0.5, backoff_max=30,
+                 metrics=False, scheme="https", limiter=None, coalesce=False):
         """ Class initialization method
 
         :param hostname: Hostname or IP Address of Cisco ACS 5.6 Sever
@@ -24,17 +39,85 @@ class ACSClient(object):
         :type password: str or unicode
         :param hide_urllib_warnings: Hide urllib3 warnings (optional)
         :type hide_urllib_warnings: boolean
+        :param cache_ttl: Cache successful reads for this many seconds; no
+            caching when None (optional)
+        :type cache_ttl: int or float
+        :param cache_size: Maximum number of cached reads (optional)
+        :type cache_size: int
+        :param verify: Verify the server certificate; a CA bundle path is
+            also accepted (optional)
+        :type verify: boolean or str
+        :param timeout: Seconds to wait for the server, either one value or a
+            (connect, read) tuple; wait forever when None (optional)
+        :type timeout: float or tuple
+        :param pool_connections: Number of connection pools to cache (optional)
+        :type pool_connections: int
+        :param pool_maxsize: Connections kept open per pool; set it to at
+            least the number of worker threads (optional)
+        :type pool_maxsize: int
+        :param keep_alive: Reuse connections between requests (optional)
+        :type keep_alive: boolean
+        :param max_retries: Retries for GET, PUT and DELETE after a connection
+            error, timeout, 429 or 5xx response (optional)
+        :type max_retries: int
+        :param backoff: Base delay in seconds for exponential backoff (optional)
+        :type backoff: float
+        :param backoff_max: Maximum delay in seconds between retries (optional)
+        :type backoff_max: float
+        :param metrics: Collect latency histograms in self.metrics (optional)
+        :type metrics: boolean
+        :param scheme: URL scheme, http is only meant for local test servers
+            (optional)
+        :type scheme: str
+        :param limiter: Concurrency limiter every request must pass, e.g.
+            acsclient.limiter.AdaptiveLimiter (optional)
+        :type limiter: acsclient.limiter.AdaptiveLimiter
+        :param coalesce: Let concurrent identical reads and searches share a
+            single request (optional)
+        :type coalesce: boolean
         """
-        self.url = "https://%s/Rest/" % hostname
+        import requests
+
+        from .transport import TimedHTTPAdapter
+
+        self.url = "%s://%s/Rest/" % (scheme, hostname)
         self.credentials = (username, password)
+        self.verify = verify
+        self.timeout = timeout
+        self.keep_alive = keep_alive
+        self.max_retries = max_retries
+        self.backoff = backoff
+        self.backoff_max = backoff_max
+        self.limiter = limiter
+        self.flights = None
+        if coalesce:
+            from .singleflight import SingleFlight
+            self.flights = SingleFlight()
+        self.retry_count = 0
+        self._retry_lock = threading.Lock()
         self.session = requests.Session()
+        self.session.auth = self.credentials
+        adapter = TimedHTTPAdapter(pool_connections=pool_connections,
+                                   pool_maxsize=pool_maxsize)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+        self.cache = None
+        if cache_ttl is not None:
+            self.cache = ReadCache(cache_ttl, cache_size)
+        self.device_groups = None
+        self.hooks = []
+        self._local = threading.local()
+        self.metrics = None
+        if metrics:
+            self.metrics = Metrics()
+            self.add_hook(self.metrics)
         if hide_urllib_warnings:
             #############################################################################
             # Disable "InsecureRequestWarning: Unverified HTTPS request is being made."
             requests.packages.urllib3.disable_warnings(requests.packages.urllib3.exceptions.InsecureRequestWarning)
             #############################################################################
 
-    def _req(self, method, frag, data=None):
+    def _req(self, method, frag, data=None, stream=False):
         """ Creates the XML REST request to the Cisco ACS 5.6 Server
 
         :param method: HTTP Method to use (GET, POST, DELETE, PUT)
@@ -43,19 +126,155 @@ class ACSClient(object):
         :type frag: str or unicode
         :param data: XML data to send to the server (optional)
         :type data: str or unicode
+        :param stream: Defer downloading the response body (optional)
+        :type stream: boolean
+        """
+        if (self.flights is not None and not stream and
+                (method.upper() == "GET" or
+                 (method.upper() == "PUT" and frag.endswith("/op/query")))):
+            return self.flights.do((method.upper(), frag, data),
+                                   lambda: self._perform(method, frag, data, stream))
+        return self._perform(method, frag, data, stream)
+
+    def _perform(self, method, frag, data=None, stream=False):
+        """ Send the request and report it to the hooks
+
+        Takes the same arguments as _req.
         """
+        if not self.hooks:
+            return self._send(method, frag, data, stream)
+        from .transport import connect_time
+
+        render_time = getattr(self._local, "render", 0.0)
+        self._local.render = 0.0
+        connect_time()
+        start = time.time()
+        r = error = None
+        try:
+            r = self._send(method, frag, data, stream)
+            return r
+        except Exception as e:
+            error = e
+            raise
+        finally:
+            self._emit(method, frag, data, stream, r, error, render_time,
+                       connect_time(), time.time() - start)
+
+    def _send(self, method, frag, data=None, stream=False):
+        """ Send the request, retrying idempotent methods when allowed
+
+        Takes the same arguments as _req.
+        """
+        import requests
+
         method = method.lower()
         headers = {'Content-Type': 'application/xml'}
-        ssl_check = False
-        self.session.auth = self.credentials
-        if method == 'get':
-            return self.session.get(self.url + frag, verify=ssl_check, data=data, headers=headers)
-        elif method == 'post':
-            return self.session.post(self.url + frag, verify=ssl_check, data=data, headers=headers)
-        elif method == 'put':
-            return self.session.put(self.url + frag, verify=ssl_check, data=data, headers=headers)
-        elif method == 'delete':
-            return self.session.delete(self.url + frag, verify=ssl_check, data=data, headers=headers)
+        if not self.keep_alive:
+            headers['Connection'] = 'close'
+        retries = self.max_retries if method in self._idempotent_methods else 0
+        attempt = self._local.retries = 0
+        while True:
+            r = None
+            if self.limiter is not None:
+                self.limiter.acquire()
+                start = time.time()
+            try:
+                r = self.session.request(method, self.url + frag, verify=self.verify,
+                                         data=data, headers=headers, stream=stream,
+                                         timeout=self.timeout)
+            except (requests.ConnectionError, requests.Timeout):
+                if self.limiter is not None:
+                    self.limiter.release(time.time() - start, True)
+                if attempt >= retries:
+                    raise
+            except BaseException:
+                if self.limiter is not None:
+                    self.limiter.release(time.time() - start)
+                raise
+            else:
+                if self.limiter is not None:
+                    self.limiter.release(time.time() - start,
+                                         r.status_code in self._retry_status)
+                if attempt >= retries or r.status_code not in self._retry_status:
+                    return r
+                r.close()
+            time.sleep(self._backoff_delay(attempt, r))
+            attempt = self._local.retries = attempt + 1
+            with self._retry_lock:
+                self.retry_count += 1
+
+    def add_hook(self, callback):
+        """ Call callback with a RequestEvent after every request
+
+        Events carry the method, object type, status code, body sizes and
+        the time spent rendering the payload, opening connections (TCP and
+        TLS), waiting for the response and reading it. Use this to feed tracing or logging; metrics=True
+        registers a built-in acsclient.metrics.Metrics collector.
+
+        :param callback: Callable taking an acsclient.metrics.RequestEvent
+        :type callback: callable
+        """
+        self.hooks.append(callback)
+
+    def _emit(self, method, frag, data, stream, r, error, render_time, connect, elapsed):
+        """ Build the RequestEvent for a finished request and pass it to the hooks """
+        method = method.upper()
+        if frag and frag.endswith("/op/query"):
+            method = "QUERY"
+        object_type = frag
+        for name in self._object_types:
+            if frag == name or (frag or "").startswith(name + "/"):
+                object_type = name
+                break
+        if isinstance(data, str):
+            data = data.encode("utf-8")
+        status = received = None
+        wait = 0.0
+        if r is not None:
+            status = r.status_code
+            # requests' elapsed includes opening the connection
+            wait = max(0.0, r.elapsed.total_seconds() - connect)
+            if stream:
+                received = int(r.headers.get("Content-Length") or 0)
+            else:
+                received = len(r.content)
+        event = RequestEvent(method, object_type, self.url + (frag or ""), status,
+                             len(data or b""), received or 0, self._local.retries,
+                             render_time, connect, wait, max(0.0, elapsed - connect - wait),
+                             elapsed + render_time, error)
+        for hook in self.hooks:
+            hook(event)
+
+    def _build(self, func, *args):
+        """ Build a request payload, timing it when hooks are registered
+
+        :param func: Template render function or model to_xml method
+        :type func: callable
+        """
+        if not self.hooks:
+            return func(*args)
+        start = time.time()
+        data = func(*args)
+        self._local.render = getattr(self._local, "render", 0.0) + time.time() - start
+        return data
+
+    def _backoff_delay(self, attempt, response=None):
+        """ Seconds to wait before the next retry
+
+        Exponential backoff with full jitter. A Retry-After header on a 429
+        or 503 response takes precedence.
+
+        :param attempt: Number of retries already made
+        :type attempt: int
+        :param response: Response that triggered the retry (optional)
+        :type response: requests.models.Response
+        """
+        if response is not None:
+            try:
+                return min(float(response.headers.get("Retry-After")), self.backoff_max)
+            except (TypeError, ValueError):
+                pass
+        return random.uniform(0, min(self.backoff_max, self.backoff * 2 ** attempt))
 
     def _frag(self, object_type, func, var=None):
         """ Creates the proper URL fragment for HTTP requests
@@ -89,10 +308,17 @@ class ACSClient(object):
 
         :param object_type: Cisco ACS Object Type
         :type object_type: str or unicode
-        :param data: XML data to send to the ACS Server
-        :type data: str or unicode
+        :param data: XML data or model object to send to the ACS Server
+        :type data: str, unicode or acsclient.models.Model
         """
-        return self._req("POST", object_type, data)
+        if hasattr(data, "to_xml"):
+            data = self._build(data.to_xml)
+        r = self._req("POST", object_type, data)
+        self._invalidate(object_type, data)
+        if (object_type == "NetworkDevice/DeviceGroup" and self.device_groups is not None
+                and r.status_code < 400):
+            self._add_group(data)
+        return r
 
     def read(self, object_type, func="all", var=None):
         """ Read data from ACS Server
@@ -104,17 +330,102 @@ class ACSClient(object):
         :param var: ACS variable either the name or id (optional)
         :type var: str or unicode
         """
-        return self._req("GET", self._frag(object_type, func, var))
+        if self.cache is None or func not in ("all", "name", "id"):
+            return self._req("GET", self._frag(object_type, func, var))
+        key = (object_type, func, None if func == "all" else str(var))
+        r = self.cache.get(key)
+        if r is None:
+            # A write racing with this GET bumps the generation, so a
+            # response that may predate it is not cached
+            generation = self.cache.generation(object_type)
+            r = self._req("GET", self._frag(object_type, func, var))
+            if r.status_code == 200:
+                identities = () if func == "all" else object_identity(r.content)
+                self.cache.put(key, r, identities, generation)
+        return r
+
+    def iter_read(self, object_type):
+        """ Read all objects of a type from ACS Server one at a time
+
+        Parsed alternative to read(object_type). The response body is
+        streamed through an incremental XML parser and each object (device,
+        user, deviceGroup, ...) is yielded as an XML element as soon as it has
+        been received. Memory use does not grow with the inventory size.
+
+        :param object_type: Cisco ACS Object Type
+        :type object_type: str or unicode
+        :returns: Generator of object elements
+        :rtype: generator
+        :raises requests.HTTPError: if ACS rejects the request
+        """
+        r = self._req("GET", self._frag(object_type, "all"), stream=True)
+        try:
+            r.raise_for_status()
+            r.raw.decode_content = True
+            for element in iterparse_objects(r.raw):
+                yield element
+        finally:
+            r.close()
+
+    def load_inventory(self):
+        """ Load every Device into a local Inventory
+
+        The inventory answers name, group and IP (exact or longest prefix)
+        lookups without further server round trips. Call refresh() on it to
+        pick up changes.
+
+        :rtype: acsclient.inventory.Inventory
+        """
+        from .inventory import Inventory
+        return Inventory(self).load()
+
+    def load_device_groups(self):
+        """ Load the Device Group hierarchy and check devices against it
+
+        Once loaded, the device create methods and bulk_create_devices
+        reject devices that name an unknown group before sending anything.
+        Groups created through this client are added to the tree; call
+        load_device_groups again to pick up other changes.
+
+        :rtype: acsclient.groups.DeviceGroupTree
+        """
+        from .groups import DeviceGroupTree
+        self.device_groups = DeviceGroupTree(self).load()
+        return self.device_groups
+
+    def _add_group(self, data):
+        """ Add a device group created on the server to the loaded tree
+
+        :param data: XML data sent to the ACS Server
+        :type data: str, unicode or bytes
+        """
+        from .models import DeviceGroup
+        group = DeviceGroup.from_xml(data, keep_source=False)
+        if group.name and group.group_type:
+            self.device_groups.add(group.name, group.group_type)
+
+    def _check_groups(self, groups):
+        """ Raise ValueError for unknown groups when the tree is loaded
+
+        :param groups: Groups list
+        :type groups: list
+        """
+        if self.device_groups is not None:
+            self.device_groups.validate(groups)
 
     def update(self, object_type, data):
         """ Update object on the ACS Server
 
         :param object_type: Cisco ACS Object Type
         :type object_type: str or unicode
-        :param data: XML data to send to the ACS Server
-        :type data: str or unicode
+        :param data: XML data or model object to send to the ACS Server
+        :type data: str, unicode or acsclient.models.Model
         """
-        return self._req("PUT", object_type, data)
+        if hasattr(data, "to_xml"):
+            data = self._build(data.to_xml)
+        r = self._req("PUT", object_type, data)
+        self._invalidate(object_type, data)
+        return r
 
     def delete(self, object_type, func, var):
         """ Delete object on the ACS Server
@@ -126,7 +437,21 @@ class ACSClient(object):
         :param var: ACS variable either the name or id
         :type var: str, unicode, or int
         """
-        return self._req("DELETE", self._frag(object_type, func, var))
+        r = self._req("DELETE", self._frag(object_type, func, var))
+        if self.cache is not None:
+            self.cache.invalidate(object_type, (var,))
+        return r
+
+    def _invalidate(self, object_type, data):
+        """ Drop cached reads of the object written by create or update
+
+        :param object_type: Cisco ACS Object Type
+        :type object_type: str or unicode
+        :param data: XML data sent to the ACS Server
+        :type data: str or unicode
+        """
+        if self.cache is not None and object_type in self._object_types:
+            self.cache.invalidate(object_type, object_identity(data) if data else ())
 
     def create_device_group(self, name, group_type, description=""):
         """ Create ACS Device Group
@@ -143,11 +468,8 @@ class ACSClient(object):
         :returns: HTTP Response code
         :rtype: requests.models.Response
         """
-        ENV = Environment(loader=FileSystemLoader(
-            os.path.join(os.path.dirname(__file__), "templates")))
-        template = ENV.get_template("devicegroup.j2")
         var = dict(name=name, group_type=group_type, description=description)
-        data = template.render(config=var)
+        data = self._build(render, "devicegroup.j2", var)
         return self.create("NetworkDevice/DeviceGroup", data)
 
     def create_tacacs_device(self, name, groups, secret, ip, description="", mask=32):
@@ -166,11 +488,9 @@ class ACSClient(object):
         :param mask: Device IP mask (optional)
         :type mask: int
         """
-        ENV = Environment(loader=FileSystemLoader(
-            os.path.join(os.path.dirname(__file__), "templates")))
-        template = ENV.get_template("device.j2")
+        self._check_groups(groups)
         var = dict(name=name, ip=ip, mask=mask, secret=secret, groups=groups, description=description)
-        data = template.render(config=var)
+        data = self._build(render, "device.j2", var)
         return self.create("NetworkDevice/Device", data)
 
     def create_radius_device(self, name, groups, secret, ip, mask=32):
@@ -187,11 +507,9 @@ class ACSClient(object):
         :param mask: Device IP mask (optional)
         :type mask: int
         """
-        ENV = Environment(loader=FileSystemLoader(
-            os.path.join(os.path.dirname(__file__), "templates")))
-        template = ENV.get_template("radius_device.j2")
+        self._check_groups(groups)
         var = dict(name=name, ip=ip, mask=mask, secret=secret, groups=groups)
-        data = template.render(config=var)
+        data = self._build(render, "radius_device.j2", var)
         return self.create("NetworkDevice/Device", data)
 
     def create_device_simple(self, name, secret, ip, location, device_type):
@@ -208,15 +526,351 @@ class ACSClient(object):
         :param device_type: Device Group Device Type
         :type device_type: str or unicode
         """
-        groups = [
+        groups = self._simple_groups(location, device_type)
+        return self.create_tacacs_device(name, groups, secret, ip)
+
+    @staticmethod
+    def _simple_groups(location, device_type):
+        """ Build the groups list for a Location and Device Type pair
+
+        :param location: Device Group Location
+        :type location: str or unicode
+        :param device_type: Device Group Device Type
+        :type device_type: str or unicode
+        """
+        return [
             {"name": "All Locations:" + location,
                 "type": "Location"},
             {"name": "All Device Types:" + device_type,
                 "type": "Device Type"},
         ]
-        return self.create_tacacs_device(name, groups, secret, ip)
 
-    def search_tacacs(self, object_type, key, value, condition):
+    def _create_device_record(self, record):
+        """ Create a Device from a bulk record
+
+        :param record: Device record (see bulk_create_devices)
+        :type record: dict or acsclient.models.Device
+        """
+        groups = self._record_groups(record)
+        if hasattr(record, "to_xml"):
+            self._check_groups(groups)
+            return self.create(record.object_type, record)
+        mask = record.get("mask") or 32
+        if (record.get("protocol") or "tacacs").lower() == "radius":
+            return self.create_radius_device(record["name"], groups,
+                                             record["secret"], record["ip"], mask)
+        return self.create_tacacs_device(record["name"], groups, record["secret"],
+                                         record["ip"], record.get("description") or "",
+                                         mask)
+
+    def _record_groups(self, record):
+        """ Return the groups list of a bulk device record
+
+        :param record: Device record (see bulk_create_devices)
+        :type record: dict or acsclient.models.Device
+        """
+        if hasattr(record, "to_xml"):
+            return record.groups or []
+        return record.get("groups") or self._simple_groups(record["location"],
+                                                           record["device_type"])
+
+    def bulk_create_devices(self, records, workers=8, progress=None,
+                            create_groups=False):
+        """ Create many Devices in parallel
+
+        Each record is a dict with ``name``, ``secret`` and ``ip`` keys plus
+        either ``groups`` (as for create_tacacs_device) or ``location`` and
+        ``device_type`` (as for create_device_simple). ``mask``,
+        ``description`` and ``protocol`` (tacacs or radius) are optional, so
+        rows from a csv.DictReader can be passed straight through.
+        acsclient.models.Device objects are accepted as well.
+
+        Records are consumed lazily and only a small window is in flight at
+        once. A failed record does not stop the run. Results are yielded as
+        requests complete, so the generator must be iterated to do the work.
+
+        After load_device_groups, records naming an unknown group fail
+        without a request. With create_groups the hierarchy is loaded if
+        needed and, once iteration starts, the missing groups are created
+        first, parent before child; the records are then read into memory
+        up front. Records whose groups could not be created, for instance
+        under an unknown top level group, fail on their own.
+
+        Example::
+
+            with open("devices.csv") as f:
+                for result in acs.bulk_create_devices(csv.DictReader(f), workers=16):
+                    if not result.ok:
+                        print(result.record["name"], result.error)
+
+        :param records: Iterable of device records
+        :type records: iterable
+        :param workers: Number of parallel requests (optional)
+        :type workers: int
+        :param progress: Called with a BulkProgress after each record (optional)
+        :type progress: callable
+        :param create_groups: Create missing device groups first (optional)
+        :type create_groups: boolean
+        :returns: Generator of BulkResult
+        :rtype: generator
+        """
+        from .bulk import run_bounded
+        if create_groups:
+            return self._bulk_create_with_groups(records, workers, progress)
+        return run_bounded(self._create_device_record, records, workers,
+                           progress=progress)
+
+    def _bulk_create_with_groups(self, records, workers, progress):
+        """ bulk_create_devices with create_groups, as a generator """
+        from .bulk import run_bounded
+        records = list(records)
+        tree = self.device_groups or self.load_device_groups()
+        groups = []
+        for record in records:
+            try:
+                groups.extend(group for group in self._record_groups(record)
+                              if tree.known(group))
+            except (KeyError, TypeError, ValueError):
+                pass  # a malformed record fails on its own below
+        tree.create_missing(groups, workers)
+        for result in run_bounded(self._create_device_record, records, workers,
+                                  progress=progress):
+            yield result
+
+    def bulk_create_device_groups(self, records, workers=8, progress=None):
+        """ Create many Device Groups in parallel
+
+        Each record is a dict with ``name`` and ``group_type`` keys and an
+        optional ``description``, or an acsclient.models.DeviceGroup. Parent
+        groups must already exist, so create one hierarchy level per call when
+        building new trees.
+
+        :param records: Iterable of device group records
+        :type records: iterable
+        :param workers: Number of parallel requests (optional)
+        :type workers: int
+        :param progress: Called with a BulkProgress after each record (optional)
+        :type progress: callable
+        :returns: Generator of BulkResult
+        :rtype: generator
+        """
+        from .bulk import run_bounded
+
+        def create(record):
+            if hasattr(record, "to_xml"):
+                return self.create(record.object_type, record)
+            return self.create_device_group(record["name"], record["group_type"],
+                                            record.get("description") or "")
+        return run_bounded(create, records, workers, progress=progress)
+
+    def _match_where(self, object_type, query, max_objects, page_size):
+        """ Return the elements of every object matching query
+
+        All pages are read before anything is written, since deleting or
+        changing objects while paging would shift the later pages.
+
+        :raises ValueError: as soon as more than max_objects objects match
+        """
+        matches = []
+        for element in self.iter_query(object_type, query, page_size, prefetch=True):
+            matches.append(element)
+            if max_objects is not None and len(matches) > max_objects:
+                raise ValueError("More than %d %s objects match %r, nothing was changed"
+                                 % (max_objects, object_type, query))
+        return matches
+
+    def delete_where(self, object_type, query, workers=8, dry_run=False,
+                     max_objects=None, page_size=500, progress=None):
+        """ Delete every object matching a query
+
+        The matching objects are listed with paged op/query searches, then
+        deleted by name in parallel. With dry_run nothing is deleted and the
+        results only name the objects that would be.
+
+        Example::
+
+            query = Query().where("name", "STARTS_WITH", "LON-")
+            results = acs.delete_where("NetworkDevice/Device", query, max_objects=500)
+
+        :param object_type: Cisco ACS Object Type
+        :type object_type: str or unicode
+        :param query: Conditions to match
+        :type query: acsclient.query.Query
+        :param workers: Number of parallel requests (optional)
+        :type workers: int
+        :param dry_run: Only list the matching objects (optional)
+        :type dry_run: boolean
+        :param max_objects: Refuse to delete anything if more objects match
+            (optional)
+        :type max_objects: int
+        :param page_size: Objects per search request (optional)
+        :type page_size: int
+        :param progress: Called with a BulkProgress after each delete (optional)
+        :type progress: callable
+        :returns: BulkResult per object, with the object name as record
+        :rtype: list
+        :raises ValueError: if more than max_objects objects match
+        """
+        from .bulk import BulkResult, run_bounded
+        names = [element.findtext("name") for element in
+                 self._match_where(object_type, query, max_objects, page_size)]
+        if dry_run:
+            return [BulkResult(name, None, None, 0.0) for name in names]
+
+        def delete(name):
+            return self.delete(object_type, "name", name)
+        return list(run_bounded(delete, names, workers, progress=progress))
+
+    def update_where(self, object_type, query, change, workers=8, dry_run=False,
+                     max_objects=None, page_size=500, progress=None):
+        """ Update every object matching a query
+
+        ``change`` is either a dict of model attributes to set, e.g.
+        ``{"description": "decommissioned"}``, or a callable taking the
+        matching model and returning the model to send, or None to leave
+        that object alone. With a dict, each object is sent back exactly as
+        ACS returned it except for those attributes. Models read from ACS
+        keep their unmodeled settings too, so a callable that changes a few
+        attributes is just as safe. The changed objects are sent in
+        parallel.
+
+        :param object_type: Cisco ACS Object Type
+        :type object_type: str or unicode
+        :param query: Conditions to match
+        :type query: acsclient.query.Query
+        :param change: Attributes to set, or callable returning the new model
+        :type change: dict or callable
+        :param workers: Number of parallel requests (optional)
+        :type workers: int
+        :param dry_run: Only build the changed objects (optional)
+        :type dry_run: boolean
+        :param max_objects: Refuse to update anything if more objects match
+            (optional)
+        :type max_objects: int
+        :param page_size: Objects per search request (optional)
+        :type page_size: int
+        :param progress: Called with a BulkProgress after each update (optional)
+        :type progress: callable
+        :returns: BulkResult per updated object, with the model sent as record
+        :rtype: list
+        :raises ValueError: if more than max_objects objects match
+        """
+        from .bulk import BulkResult, run_bounded
+        from .models import MODELS, from_element
+        matches = self._match_where(object_type, query, max_objects, page_size)
+        if callable(change):
+            changed = [obj for obj in (change(from_element(e)) for e in matches)
+                       if obj is not None]
+        else:
+            changed = [MODELS[object_type].patch(e, **change) for e in matches]
+        if dry_run:
+            return [BulkResult(obj, None, None, 0.0) for obj in changed]
+
+        def update(obj):
+            return self.update(object_type, obj)
+        return list(run_bounded(update, changed, workers, progress=progress))
+
+    def write_behind(self, interval=1.0, workers=8, on_error=None):
+        """ Return a queue that buffers creates and updates
+
+        Writes return a Future at once and are sent in parallel batches every
+        interval; pending writes to the same object are merged so only the
+        latest one is sent (see acsclient.writebehind). Close the queue, or
+        use it as a context manager, to flush what is left.
+
+        :param interval: Seconds between flushes (optional)
+        :type interval: float
+        :param workers: Number of parallel requests per flush (optional)
+        :type workers: int
+        :param on_error: Called with the BulkResult of every failed write
+            (optional)
+        :type on_error: callable
+        :rtype: acsclient.writebehind.WriteBehindQueue
+        """
+        from .writebehind import WriteBehindQueue
+        return WriteBehindQueue(self, interval, workers, on_error)
+
+    def reconcile(self, desired_devices, desired_groups=(), delete=False,
+                  workers=8, dry_run=False, progress=None):
+        """ Bring the server in line with a desired set of devices and groups
+
+        The current state is fetched once and compared field by field
+        (groups, subnets, secrets, description) with the desired objects.
+        Only the needed POST, PUT and DELETE calls are made, in parallel,
+        with device groups created parent before child and before any device.
+        With dry_run the plan is printed and nothing is written.
+
+        :param desired_devices: Devices as acsclient.models.Device objects or
+            Device keyword dicts
+        :type desired_devices: iterable
+        :param desired_groups: Device groups as acsclient.models.DeviceGroup
+            objects or DeviceGroup keyword dicts (optional)
+        :type desired_groups: iterable
+        :param delete: Delete devices (and groups, if desired_groups is
+            given) that are not in the desired state (optional)
+        :type delete: boolean
+        :param workers: Number of parallel requests (optional)
+        :type workers: int
+        :param dry_run: Only print the plan (optional)
+        :type dry_run: boolean
+        :param progress: Called with a BulkProgress after each write (optional)
+        :type progress: callable
+        :returns: Executed plan, with a BulkResult per write in plan.results
+        :rtype: acsclient.reconcile.Plan
+        """
+        from . import reconcile as _reconcile
+        plan = _reconcile.plan(self, desired_devices, desired_groups, delete)
+        if dry_run:
+            print(plan)
+            return plan
+        return _reconcile.apply(self, plan, workers, progress)
+
+    def export(self, destination, object_types=None, workers=4, page_size=500,
+               progress=None):
+        """ Export every object of the given types to JSONL or SQLite
+
+        Object types are fetched in parallel, page by page, and streamed to
+        the destination with a checkpoint after each page. Rerun with the
+        same arguments to resume an interrupted export. See acsclient.export.
+
+        :param destination: Output file, .jsonl for JSON lines, otherwise SQLite
+        :type destination: str
+        :param object_types: Object types to export (optional, defaults to
+            devices, device groups, users and hosts)
+        :type object_types: list
+        :param workers: Number of object types fetched in parallel (optional)
+        :type workers: int
+        :param page_size: Objects per request and per checkpoint (optional)
+        :type page_size: int
+        :param progress: Called with (object_type, page, count) after every
+            page (optional)
+        :type progress: callable
+        :returns: Number of objects written per object type in this run
+        :rtype: dict
+        """
+        from .export import export
+        return export(self, destination, object_types, workers, page_size, progress)
+
+    def sync(self, object_type, previous=None, page_size=500):
+        """ Report objects added, changed or removed since a previous sync
+
+        Objects are fetched page by page and compared with the previous
+        snapshot by content fingerprint (see acsclient.sync). Pass the
+        returned delta.snapshot as previous on the next call.
+
+        :param object_type: Cisco ACS Object Type
+        :type object_type: str or unicode
+        :param previous: Snapshot from the last sync (optional)
+        :type previous: dict
+        :param page_size: Objects per request (optional)
+        :type page_size: int
+        :rtype: acsclient.sync.Delta
+        """
+        from .sync import sync
+        return sync(self, object_type, previous, page_size)
+
+    def search_tacacs(self, object_type, key, value, condition,
+                      page_size=100, page=1):
         """
         Search for a value within TACACS
 
@@ -229,6 +883,9 @@ class ACSClient(object):
             - NOT_EQUALS
             - STARTS_WITH
 
+        Only a single page of results is returned. Use iter_search to walk
+        every page.
+
         :param object_type: Cisco ACS Object Type
         :type object_type: str or unicode
         :param key: Key to search
@@ -237,10 +894,127 @@ class ACSClient(object):
         :type value: str
         :param condition: condition to match
         :type condition: str
+        :param page_size: Number of results per page (optional)
+        :type page_size: int
+        :param page: Page number to return, starting at 1 (optional)
+        :type page: int
+        """
+        var = dict(filters=[dict(key=key, filter=condition, value=value)],
+                   page_size=page_size, page=page)
+        data = self._build(render, "search.j2", var)
+        return self.update(self._frag(object_type, 'op'), data)
+
+    def search(self, object_type, query, page_size=100, page=1):
+        """ Search with several conditions in a single request
+
+        The conditions of the query are evaluated by ACS, so only matching
+        objects are sent back. Only a single page of results is returned. Use
+        iter_query to walk every page.
+
+        :param object_type: Cisco ACS Object Type (Identity/User, Host,
+            NetworkDevice/Device, ...)
+        :type object_type: str or unicode
+        :param query: Conditions to match
+        :type query: acsclient.query.Query
+        :param page_size: Number of results per page (optional)
+        :type page_size: int
+        :param page: Page number to return, starting at 1 (optional)
+        :type page: int
         """
-        ENV = Environment(loader=FileSystemLoader(
-            os.path.join(os.path.dirname(__file__), "templates")))
-        template = ENV.get_template("search.j2")
-        var = dict(key=key, filter=condition, value=value)
-        data = template.render(config=var)
+        data = self._build(render, "search.j2", query.to_config(page_size, page))
         return self.update(self._frag(object_type, 'op'), data)
+
+    def iter_search(self, object_type, key, value, condition,
+                    page_size=100, prefetch=False):
+        """ Search for a value within TACACS across all result pages
+
+        Pages are requested one at a time and each matching object is yielded
+        as an XML element, so memory use is bounded by the page size rather
+        than the number of results. With prefetch enabled the next page is
+        requested in the background while the current one is consumed.
+
+        :param object_type: Cisco ACS Object Type
+        :type object_type: str or unicode
+        :param key: Key to search
+        :type key: str or unicode
+        :param value: value to search for
+        :type value: str
+        :param condition: condition to match (see search_tacacs)
+        :type condition: str
+        :param page_size: Number of results per page (optional)
+        :type page_size: int
+        :param prefetch: Fetch the next page in the background (optional)
+        :type prefetch: boolean
+        :returns: Generator of matching object elements
+        :rtype: generator
+        :raises requests.HTTPError: if ACS rejects a page request
+        """
+        def fetch(page):
+            return self.search_tacacs(object_type, key, value, condition,
+                                      page_size=page_size, page=page)
+        return self._iter_pages(fetch, page_size, prefetch)
+
+    def iter_query(self, object_type, query, page_size=100, prefetch=False):
+        """ Search with several conditions across all result pages
+
+        Same as iter_search, but with the conditions of a Query.
+
+        :param object_type: Cisco ACS Object Type
+        :type object_type: str or unicode
+        :param query: Conditions to match
+        :type query: acsclient.query.Query
+        :param page_size: Number of results per page (optional)
+        :type page_size: int
+        :param prefetch: Fetch the next page in the background (optional)
+        :type prefetch: boolean
+        :returns: Generator of matching object elements
+        :rtype: generator
+        :raises requests.HTTPError: if ACS rejects a page request
+        """
+        def fetch(page):
+            return self.search(object_type, query, page_size=page_size, page=page)
+        return self._iter_pages(fetch, page_size, prefetch)
+
+    def _iter_pages(self, search, page_size, prefetch):
+        """ Yield the objects of every page returned by search(page)
+
+        :param search: Callable returning the response for a page number
+        :type search: callable
+        :param page_size: Number of results per page
+        :type page_size: int
+        :param prefetch: Fetch the next page in the background
+        :type prefetch: boolean
+        """
+        def fetch(page):
+            r = search(page)
+            r.raise_for_status()
+            return list(iter_objects(r.content))
+
+        if not prefetch:
+            page = 1
+            while True:
+                objects = fetch(page)
+                for obj in objects:
+                    yield obj
+                if len(objects) < page_size:
+                    return
+                page += 1
+
+        from concurrent.futures import ThreadPoolExecutor
+        executor = ThreadPoolExecutor(max_workers=1)
+        try:
+            page = 1
+            pending = executor.submit(fetch, page)
+            while True:
+                objects = pending.result()
+                if len(objects) < page_size:
+                    pending = None
+                else:
+                    page += 1
+                    pending = executor.submit(fetch, page)
+                for obj in objects:
+                    yield obj
+                if pending is None:
+                    return
+        finally:
+            executor.shutdown(wait=False)
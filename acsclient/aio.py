@@ -0,0 +1,122 @@
+import asyncio
+import functools
+from concurrent.futures import ThreadPoolExecutor
+
+from .acsclient import ACSClient
+
+
+class AsyncACSClient(object):
+    """ asyncio front end for ACSClient
+
+    Every call is dispatched to a blocking ACSClient on a worker thread, so
+    URL building, payload templates and responses are exactly those of the
+    synchronous client. At most ``concurrency`` requests are in flight at
+    once; callers can schedule as many coroutines as they like.
+
+    Example::
+
+        async with AsyncACSClient("192.168.1.11", "api", "password123",
+                                  concurrency=32) as acs:
+            names = ["ROUTER%02d" % i for i in range(100)]
+            responses = await asyncio.gather(
+                *[acs.read("NetworkDevice/Device", "name", n) for n in names])
+    """
+
+    def __init__(self, hostname, username, password,
+                 hide_urllib_warnings=False, concurrency=10, **kwargs):
+        """ Class initialization method
+
+        :param hostname: Hostname or IP Address of Cisco ACS 5.6 Sever
+        :type hostname: str or unicode
+        :param username: Cisco ACS admin user name
+        :type username: str or unicode
+        :param password: Cisco ACS admin user password
+        :type password: str or unicode
+        :param hide_urllib_warnings: Hide urllib3 warnings (optional)
+        :type hide_urllib_warnings: boolean
+        :param concurrency: Maximum number of requests in flight (optional)
+        :type concurrency: int
+
+        Other keyword arguments (timeouts, retries, cache, ...) are passed to
+        ACSClient. The connection pool defaults to one connection per
+        concurrent request.
+        """
+        kwargs.setdefault("pool_maxsize", concurrency)
+        self.client = ACSClient(hostname, username, password,
+                                hide_urllib_warnings, **kwargs)
+        self.concurrency = concurrency
+        self._executor = ThreadPoolExecutor(max_workers=concurrency)
+        self._semaphore = None
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        self.close()
+
+    def close(self):
+        """ Release the worker threads and HTTP connections """
+        self._executor.shutdown(wait=False)
+        self.client.session.close()
+
+    async def _run(self, func, *args, **kwargs):
+        """ Run a blocking ACSClient method on the worker pool
+
+        :param func: Bound ACSClient method
+        :type func: callable
+        """
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.concurrency)
+        async with self._semaphore:
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(
+                self._executor, functools.partial(func, *args, **kwargs))
+
+    async def create(self, object_type, data):
+        """ Create object on the ACS Server (see ACSClient.create) """
+        return await self._run(self.client.create, object_type, data)
+
+    async def read(self, object_type, func="all", var=None):
+        """ Read data from ACS Server (see ACSClient.read) """
+        return await self._run(self.client.read, object_type, func, var)
+
+    async def update(self, object_type, data):
+        """ Update object on the ACS Server (see ACSClient.update) """
+        return await self._run(self.client.update, object_type, data)
+
+    async def delete(self, object_type, func, var):
+        """ Delete object on the ACS Server (see ACSClient.delete) """
+        return await self._run(self.client.delete, object_type, func, var)
+
+    async def create_device_group(self, name, group_type, description=""):
+        """ Create ACS Device Group (see ACSClient.create_device_group) """
+        return await self._run(self.client.create_device_group,
+                               name, group_type, description)
+
+    async def create_tacacs_device(self, name, groups, secret, ip,
+                                   description="", mask=32):
+        """ Create a new Device with TACACS (see ACSClient.create_tacacs_device) """
+        return await self._run(self.client.create_tacacs_device,
+                               name, groups, secret, ip, description, mask)
+
+    async def create_radius_device(self, name, groups, secret, ip, mask=32):
+        """ Create a new Device with RADIUS (see ACSClient.create_radius_device) """
+        return await self._run(self.client.create_radius_device,
+                               name, groups, secret, ip, mask)
+
+    async def create_device_simple(self, name, secret, ip, location,
+                                   device_type):
+        """ Simple way to create a new Device (see ACSClient.create_device_simple) """
+        return await self._run(self.client.create_device_simple,
+                               name, secret, ip, location, device_type)
+
+    async def search_tacacs(self, object_type, key, value, condition,
+                            page_size=100, page=1):
+        """ Search for a value within TACACS (see ACSClient.search_tacacs) """
+        return await self._run(self.client.search_tacacs, object_type, key,
+                               value, condition, page_size, page)
+
+    async def search(self, object_type, query, page_size=100, page=1):
+        """ Search with several conditions (see ACSClient.search) """
+        return await self._run(self.client.search, object_type, query,
+                               page_size, page)
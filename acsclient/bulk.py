@@ -0,0 +1,84 @@
+import time
+from collections import namedtuple
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+from .parse import error_message
+
+
+class BulkResult(namedtuple("BulkResult", "record status error elapsed")):
+    """ Outcome of a single bulk operation
+
+    :ivar record: Input record the operation was run for
+    :ivar status: HTTP status code, or None if no response was received
+    :ivar error: ACS error text or exception message, None on success
+    :ivar elapsed: Seconds spent on the request
+    """
+    __slots__ = ()
+
+    @property
+    def ok(self):
+        return self.error is None
+
+
+BulkProgress = namedtuple("BulkProgress", "done failed elapsed rate")
+
+
+def run_bounded(func, items, workers=8, window=None, progress=None):
+    """ Run func over items on a thread pool and yield a BulkResult per item
+
+    At most ``window`` items (twice the worker count by default) are pulled
+    from the input and held at once, so arbitrarily large or streaming inputs
+    run in constant memory. Results are yielded in completion order. A failing
+    item never stops the run; its error is recorded in its result.
+
+    :param func: Callable taking one item and returning a requests Response
+    :type func: callable
+    :param items: Iterable of items
+    :type items: iterable
+    :param workers: Number of worker threads (optional)
+    :type workers: int
+    :param window: Maximum number of items in flight (optional)
+    :type window: int
+    :param progress: Called with a BulkProgress after every item (optional)
+    :type progress: callable
+    :returns: Generator of BulkResult
+    :rtype: generator
+    """
+    window = window or workers * 2
+    started = time.time()
+    done = failed = 0
+
+    def call(item):
+        start = time.time()
+        try:
+            r = func(item)
+        except Exception as e:
+            return BulkResult(item, None, str(e) or repr(e), time.time() - start)
+        elapsed = time.time() - start
+        if r.status_code >= 400:
+            return BulkResult(item, r.status_code, error_message(r), elapsed)
+        return BulkResult(item, r.status_code, None, elapsed)
+
+    items = iter(items)
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        pending = set()
+        exhausted = False
+        while pending or not exhausted:
+            while not exhausted and len(pending) < window:
+                try:
+                    pending.add(executor.submit(call, next(items)))
+                except StopIteration:
+                    exhausted = True
+            if not pending:
+                break
+            finished, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in finished:
+                result = future.result()
+                done += 1
+                if not result.ok:
+                    failed += 1
+                if progress is not None:
+                    elapsed = time.time() - started
+                    progress(BulkProgress(done, failed, elapsed,
+                                          done / elapsed if elapsed else 0.0))
+                yield result
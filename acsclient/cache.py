@@ -0,0 +1,131 @@
+import threading
+import time
+from collections import OrderedDict
+
+
+class ReadCache(object):
+    """ LRU cache with a time to live for ACS read responses
+
+    Entries are keyed by ``(object_type, func, var)`` and tagged with the
+    name and id of the object they hold, so a write to either identity drops
+    every cached view of that object. Whole-list reads (func "all") are
+    dropped by any write to their object type.
+
+    Every invalidation also bumps a per object type generation. A reader
+    takes the generation before its request and passes it to put(), which
+    then refuses a response that may predate a write made in the meantime.
+
+    :ivar hits: Number of lookups answered from the cache
+    :ivar misses: Number of lookups that had to go to the server
+    """
+
+    def __init__(self, ttl=60, maxsize=1024):
+        """ Class initialization method
+
+        :param ttl: Seconds an entry stays valid
+        :type ttl: int or float
+        :param maxsize: Maximum number of entries before the least recently
+            used one is evicted
+        :type maxsize: int
+        """
+        self.ttl = ttl
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._tags = {}
+        self._generations = {}
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def get(self, key):
+        """ Return the cached value for key, or None
+
+        :param key: (object_type, func, var)
+        :type key: tuple
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry[0] < time.time():
+                if entry is not None:
+                    self._drop(key)
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+
+    def generation(self, object_type):
+        """ Return the invalidation count of an object type
+
+        :param object_type: Cisco ACS Object Type
+        :type object_type: str or unicode
+        :rtype: int
+        """
+        with self._lock:
+            return self._generations.get(object_type, 0)
+
+    def put(self, key, value, identities=(), generation=None):
+        """ Store value under key
+
+        :param key: (object_type, func, var)
+        :type key: tuple
+        :param value: Value to cache
+        :param identities: Names and ids of the object held in value
+        :type identities: iterable
+        :param generation: generation() taken before value was fetched; the
+            value is dropped if the object type was invalidated since
+            (optional)
+        :type generation: int
+        :returns: Whether the value was stored
+        :rtype: boolean
+        """
+        object_type = key[0]
+        tags = set((object_type, str(i)) for i in identities if i is not None)
+        tags.add((object_type, str(key[2]) if key[1] != "all" else None))
+        with self._lock:
+            if (generation is not None and
+                    generation != self._generations.get(object_type, 0)):
+                return False
+            if key in self._entries:
+                self._drop(key)
+            self._entries[key] = (time.time() + self.ttl, value, tags)
+            for tag in tags:
+                self._tags.setdefault(tag, set()).add(key)
+            while len(self._entries) > self.maxsize:
+                self._drop(next(iter(self._entries)))
+        return True
+
+    def invalidate(self, object_type, identities=()):
+        """ Drop every entry for the given object and all lists of its type
+
+        :param object_type: Cisco ACS Object Type
+        :type object_type: str or unicode
+        :param identities: Names and/or ids of the object that changed
+        :type identities: iterable
+        """
+        tags = [(object_type, str(i)) for i in identities if i is not None]
+        tags.append((object_type, None))
+        with self._lock:
+            self._generations[object_type] = self._generations.get(object_type, 0) + 1
+            for tag in tags:
+                for key in list(self._tags.get(tag, ())):
+                    self._drop(key)
+
+    def clear(self):
+        """ Drop all entries """
+        with self._lock:
+            self._entries.clear()
+            self._tags.clear()
+            for object_type in self._generations:
+                self._generations[object_type] += 1
+
+    def _drop(self, key):
+        _, _, tags = self._entries.pop(key)
+        for tag in tags:
+            keys = self._tags[tag]
+            keys.discard(key)
+            if not keys:
+                del self._tags[tag]
@@ -0,0 +1,259 @@
+"""
+``acsclient`` command line tool for bulk jobs
+
+Usage::
+
+    acsclient export HOST USER inventory.jsonl --type NetworkDevice/Device
+    acsclient import HOST USER devices.csv --workers 16
+    acsclient search HOST USER NetworkDevice/Device --where name STARTS_WITH LON-
+    acsclient delete HOST USER NetworkDevice/Device --where name STARTS_WITH LON- --dry-run
+
+The password is read from the ACS_PASSWORD environment variable, or asked
+for. Input is read and output written one object at a time, and progress
+(objects and objects per second) is printed on stderr.
+
+import takes CSV rows in the bulk_create_devices format, or JSON lines as
+written by export, where every line carries its object_type.
+"""
+import argparse
+import csv
+import getpass
+import json
+import os
+import sys
+import threading
+import time
+
+from .bulk import run_bounded
+from .export import OBJECT_TYPES, export, from_record, to_record
+from .models import MODELS
+from .query import Query
+
+
+class Progress(object):
+    """ Single status line on stderr, redrawn at most every interval """
+
+    def __init__(self, label, stream=None, interval=0.5):
+        self.label = label
+        self.stream = stream or sys.stderr
+        self.interval = interval
+        self.done = self.failed = 0
+        self.started = time.time()
+        self._shown = 0.0
+        self._lock = threading.Lock()
+
+    def __call__(self, progress):
+        """ Update from a BulkProgress """
+        self.done, self.failed = progress.done, progress.failed
+        self.show()
+
+    def add(self, count=1, failed=0):
+        with self._lock:
+            self.done += count
+            self.failed += failed
+        self.show()
+
+    def show(self, final=False):
+        now = time.time()
+        if not final and now - self._shown < self.interval:
+            return
+        self._shown = now
+        elapsed = now - self.started
+        rate = self.done / elapsed if elapsed else 0.0
+        line = "\r%s: %d objects, %d failed, %.0f/s" % (self.label, self.done,
+                                                        self.failed, rate)
+        self.stream.write(line + ("\n" if final else ""))
+        self.stream.flush()
+
+
+def read_records(path):
+    """ Yield records from a CSV or JSON lines file, "-" for stdin
+
+    :param path: File path ending in .jsonl/.json for JSON lines, anything
+        else is read as CSV with a header row
+    :type path: str
+    :rtype: generator
+    """
+    f = sys.stdin if path == "-" else open(path)
+    try:
+        if os.path.splitext(path)[1] in (".jsonl", ".json"):
+            for line in f:
+                if line.strip():
+                    yield json.loads(line)
+        else:
+            for row in csv.DictReader(f):
+                yield row
+    finally:
+        if f is not sys.stdin:
+            f.close()
+
+
+def build_query(args):
+    """ Query from the --where and --any options
+
+    :rtype: acsclient.query.Query
+    """
+    if not args.where:
+        return Query.everything()
+    query = Query("any" if args.any else "all")
+    for key, condition, value in args.where:
+        query.where(key, condition, value)
+    return query
+
+
+def cmd_export(client, args):
+    progress = Progress("export")
+
+    def report(object_type, page, count):
+        progress.add(count)
+
+    try:
+        export(client, args.destination, args.object_types, args.workers,
+               args.page_size, report)
+    except ValueError as e:
+        sys.stderr.write("%s\n" % e)
+        return 2
+    progress.show(True)
+    return 0
+
+
+def cmd_import(client, args):
+    def write(record):
+        if "object_type" not in record:
+            return client._create_device_record(record)
+        obj = from_record(record, create=not args.update)
+        if args.update:
+            return client.update(obj.object_type, obj)
+        return client.create(obj.object_type, obj)
+
+    progress = Progress("import")
+    failed = 0
+    for result in run_bounded(write, read_records(args.source), args.workers,
+                              progress=progress):
+        if not result.ok:
+            failed += 1
+            name = result.record.get("name")
+            sys.stderr.write("\n%s: %s\n" % (name, result.error))
+    progress.show(True)
+    return 1 if failed else 0
+
+
+def cmd_search(client, args):
+    progress = Progress("search")
+    out = sys.stdout
+    for element in client.iter_query(args.object_type, build_query(args),
+                                     args.page_size, prefetch=True):
+        record = to_record(element)
+        if args.names:
+            out.write("%s\n" % record["name"])
+        else:
+            record["object_type"] = args.object_type
+            out.write(json.dumps(record, sort_keys=True) + "\n")
+        progress.add()
+    progress.show(True)
+    return 0
+
+
+def cmd_delete(client, args):
+    progress = Progress("delete")
+    try:
+        results = client.delete_where(args.object_type, build_query(args), args.workers,
+                                      args.dry_run, args.max_objects, args.page_size,
+                                      progress)
+    except ValueError as e:
+        sys.stderr.write("%s\n" % e)
+        return 2
+    if args.dry_run:
+        for result in results:
+            print(result.record)
+        sys.stderr.write("%d objects would be deleted\n" % len(results))
+        return 0
+    progress.show(True)
+    failed = [result for result in results if not result.ok]
+    for result in failed:
+        sys.stderr.write("%s: %s\n" % (result.record, result.error))
+    return 1 if failed else 0
+
+
+def parser():
+    """ Build the argument parser
+
+    :rtype: argparse.ArgumentParser
+    """
+    common = argparse.ArgumentParser(add_help=False)
+    common.add_argument("hostname")
+    common.add_argument("username")
+    common.add_argument("--workers", type=int, default=8,
+                        help="Parallel requests (default 8)")
+    common.add_argument("--page-size", type=int, default=500,
+                        help="Objects per search request (default 500)")
+    common.add_argument("--retries", type=int, default=3,
+                        help="Retries for failed idempotent requests (default 3)")
+    common.add_argument("--scheme", default="https", choices=["https", "http"],
+                        help=argparse.SUPPRESS)
+
+    search = argparse.ArgumentParser(add_help=False)
+    search.add_argument("object_type", choices=sorted(MODELS), metavar="object_type",
+                        help="One of %s" % ", ".join(sorted(MODELS)))
+    search.add_argument("--where", nargs=3, action="append",
+                        metavar=("KEY", "CONDITION", "VALUE"),
+                        help="Filter, e.g. name STARTS_WITH LON- (repeatable)")
+    search.add_argument("--any", action="store_true",
+                        help="Match any --where instead of all of them")
+
+    p = argparse.ArgumentParser(prog="acsclient",
+                                description="Bulk operations against Cisco ACS")
+    sub = p.add_subparsers(dest="command")
+    sub.required = True
+
+    s = sub.add_parser("export", parents=[common],
+                       help="Export objects to JSONL or SQLite")
+    s.add_argument("destination", help="Output .jsonl or SQLite file")
+    s.add_argument("--type", dest="object_types", action="append",
+                   choices=OBJECT_TYPES + ["Identity/IdentityGroup"],
+                   help="Object type to export (repeatable)")
+    s.set_defaults(func=cmd_export)
+
+    s = sub.add_parser("import", parents=[common],
+                       help="Create objects from CSV or JSON lines")
+    s.add_argument("source", help="Input .csv or .jsonl file, - for CSV on stdin")
+    s.add_argument("--update", action="store_true",
+                   help="Update existing objects instead of creating them (JSON lines)")
+    s.set_defaults(func=cmd_import)
+
+    s = sub.add_parser("search", parents=[common, search],
+                       help="Print matching objects as JSON lines")
+    s.add_argument("--names", action="store_true", help="Print only the object names")
+    s.set_defaults(func=cmd_search)
+
+    s = sub.add_parser("delete", parents=[common, search],
+                       help="Delete every object matching the --where filters")
+    s.add_argument("--dry-run", action="store_true",
+                   help="Only print the names that would be deleted")
+    s.add_argument("--max-objects", type=int,
+                   help="Refuse to delete more than this many objects")
+    s.set_defaults(func=cmd_delete)
+    return p
+
+
+def main(argv=None):
+    """ Entry point of the acsclient console command """
+    from .acsclient import ACSClient
+
+    args = parser().parse_args(argv)
+    if args.command == "delete" and not args.where:
+        sys.stderr.write("delete needs at least one --where filter\n")
+        return 2
+    password = os.environ.get("ACS_PASSWORD") or getpass.getpass()
+    client = ACSClient(args.hostname, args.username, password, True,
+                       pool_maxsize=max(args.workers, 10), max_retries=args.retries,
+                       scheme=args.scheme)
+    try:
+        return args.func(client, args)
+    except KeyboardInterrupt:
+        sys.stderr.write("\nInterrupted\n")
+        return 130
+
+
+if __name__ == "__main__":
+    sys.exit(main())
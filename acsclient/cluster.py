@@ -0,0 +1,154 @@
+import itertools
+import threading
+
+from .acsclient import ACSClient
+from .parse import service_locations
+
+
+class ACSCluster(object):
+    """ Client for an ACS deployment with a primary and secondary instances
+
+    Writes (create, update, delete and every helper built on them) go to the
+    primary, which is the only instance that accepts configuration changes.
+    Reads (read, search_tacacs, search and the iter_* generators) are spread
+    round robin over the healthy secondaries and fall back to the primary
+    when none is available. A read that fails with a connection error or
+    timeout marks the node down and is retried on the next one.
+
+    A background thread checks every node with a Common/AcsVersion request
+    and brings recovered nodes back into rotation.
+
+    Example::
+
+        cluster = ACSCluster.discover("acs-primary", "api", "password123")
+        cluster.read("NetworkDevice/Device", "name", "ROUTER01")   # secondary
+        cluster.create_device_simple(...)                          # primary
+    """
+
+    read_methods = ("read", "search_tacacs", "search")
+    stream_methods = ("iter_read", "iter_search", "iter_query", "load_inventory",
+                      "export", "sync")
+
+    def __init__(self, nodes, username, password, primary=None,
+                 health_interval=30, **kwargs):
+        """ Class initialization method
+
+        :param nodes: Hostnames or addresses of every ACS instance
+        :type nodes: list
+        :param username: Cisco ACS admin user name
+        :type username: str or unicode
+        :param password: Cisco ACS admin user password
+        :type password: str or unicode
+        :param primary: Primary instance, the first node when None (optional)
+        :type primary: str
+        :param health_interval: Seconds between health checks, no background
+            checks when 0 or None (optional)
+        :type health_interval: int or float
+
+        Other keyword arguments are passed to every ACSClient. A read-through
+        cache is per node and is only invalidated by writes on the primary,
+        so leave cache_ttl unset unless stale reads are acceptable.
+        """
+        nodes = list(nodes)
+        self.primary = primary or nodes[0]
+        if self.primary not in nodes:
+            nodes.insert(0, self.primary)
+        kwargs.setdefault("timeout", (5, 60))
+        self.clients = dict((node, ACSClient(node, username, password, **kwargs))
+                            for node in nodes)
+        self.secondaries = [node for node in nodes if node != self.primary]
+        self.healthy = set(nodes)
+        self._rotation = itertools.cycle(self.secondaries or [self.primary])
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+        if health_interval:
+            self._thread = threading.Thread(target=self._health_loop,
+                                            args=(health_interval,))
+            self._thread.daemon = True
+            self._thread.start()
+
+    @classmethod
+    def discover(cls, hostname, username, password, **kwargs):
+        """ Build a cluster from the Common/ServiceLocation of one instance
+
+        :param hostname: Any reachable ACS instance
+        :type hostname: str
+        :param username: Cisco ACS admin user name
+        :type username: str or unicode
+        :param password: Cisco ACS admin user password
+        :type password: str or unicode
+        :rtype: ACSCluster
+        :raises requests.HTTPError: if the service locations cannot be read
+        """
+        seed = ACSClient(hostname, username, password,
+                         **dict((k, v) for k, v in kwargs.items() if k != "health_interval"))
+        r = seed.read("Common/ServiceLocation")
+        r.raise_for_status()
+        locations = service_locations(r.content) or [(hostname, True)]
+        primary = [address for address, is_primary in locations if is_primary]
+        return cls([address for address, _ in locations], username, password,
+                   primary[0] if primary else hostname, **kwargs)
+
+    def close(self):
+        """ Stop the health checks and close every session """
+        self._stop.set()
+        for client in self.clients.values():
+            client.session.close()
+
+    def check_health(self):
+        """ Check every node now and update the healthy set
+
+        :returns: Set of healthy nodes
+        :rtype: set
+        """
+        for node, client in self.clients.items():
+            try:
+                # Bypass the read cache and request coalescing, which could
+                # answer for a node that is down
+                ok = client._perform("GET", "Common/AcsVersion").status_code == 200
+            except Exception:
+                ok = False
+            with self._lock:
+                if ok:
+                    self.healthy.add(node)
+                else:
+                    self.healthy.discard(node)
+        return set(self.healthy)
+
+    def _health_loop(self, interval):
+        while not self._stop.wait(interval):
+            self.check_health()
+
+    def _read_nodes(self):
+        """ Healthy secondaries in rotation order, then the primary """
+        with self._lock:
+            healthy = [node for node in self.secondaries if node in self.healthy]
+            if healthy:
+                first = next(self._rotation)
+                while first not in healthy:
+                    first = next(self._rotation)
+                start = healthy.index(first)
+                healthy = healthy[start:] + healthy[:start]
+        return healthy + [self.primary]
+
+    def _read(self, name, *args, **kwargs):
+        import requests
+
+        nodes = self._read_nodes()
+        for i, node in enumerate(nodes):
+            try:
+                return getattr(self.clients[node], name)(*args, **kwargs)
+            except (requests.ConnectionError, requests.Timeout):
+                if node != self.primary:
+                    with self._lock:
+                        self.healthy.discard(node)
+                if i == len(nodes) - 1:
+                    raise
+
+    def __getattr__(self, name):
+        if name in self.read_methods:
+            return lambda *args, **kwargs: self._read(name, *args, **kwargs)
+        if name in self.stream_methods:
+            return getattr(self.clients[self._read_nodes()[0]], name)
+        return getattr(self.clients[self.primary], name)
@@ -0,0 +1,283 @@
+"""
+Full inventory export to JSONL or SQLite
+
+Object types are fetched in parallel, one paged op/query search per type,
+and every page is written out as soon as it arrives. Progress is
+checkpointed after each page, so an interrupted export resumes with the
+next page instead of starting over:
+
+- JSONL: a ``<destination>.checkpoint`` JSON file records the next page per
+  type and the file size at that point. The file is cut back to that size
+  on resume, so no record is written twice.
+- SQLite: records and checkpoints are committed in the same transaction.
+
+Page numbers only mean something for the page size and object types they
+were written with, so both are checkpointed too and an export started with
+different ones is refused rather than resumed.
+
+Example::
+
+    export(acs, "inventory.jsonl")
+    export(acs, "inventory.db", ["NetworkDevice/Device"], page_size=1000)
+
+or from the shell::
+
+    python -m acsclient.export acs.example.com api inventory.jsonl
+"""
+import getpass
+import json
+import os
+import sqlite3
+import sys
+import threading
+import xml.etree.ElementTree as ET
+from concurrent.futures import ThreadPoolExecutor
+
+from .models import MODELS, from_element
+from .parse import iter_objects, localname
+from .query import Query
+
+OBJECT_TYPES = ["NetworkDevice/Device", "NetworkDevice/DeviceGroup",
+                "Identity/User", "Host"]
+
+
+def to_record(element):
+    """ Convert an object element to a JSON serializable dict
+
+    The record holds the model attributes for convenient querying and, under
+    ``xml``, the complete element as returned by ACS, so settings the models
+    do not cover are kept as well. Objects without a model only get name,
+    id and xml.
+
+    :param element: Object element from an ACS response
+    :type element: xml.etree.ElementTree.Element
+    :rtype: dict
+    """
+    try:
+        model = from_element(element, keep_source=False)
+    except KeyError:
+        record = dict((localname(child.tag), child.text) for child in element
+                      if localname(child.tag) in ("id", "name"))
+    else:
+        record = {}
+        for key, value in model.to_dict().items():
+            if isinstance(value, list):
+                value = [item._asdict() for item in value]
+            record[key] = value
+    record["xml"] = ET.tostring(element, encoding="unicode")
+    return record
+
+
+def from_record(record, create=False):
+    """ Turn a record written by export back into a model
+
+    The model is built from the record's ``xml`` when present, with the
+    record's model attributes applied on top, so edits to those attributes
+    are picked up and everything else is sent back as exported.
+
+    :param record: Dict with an object_type key, as written by export
+    :type record: dict
+    :param create: Drop the id, for creating the object on another server
+        (optional)
+    :type create: boolean
+    :rtype: acsclient.models.Model
+    """
+    record = dict(record)
+    cls = MODELS[record.pop("object_type")]
+    source = record.pop("xml", None)
+    record.pop("id", None)
+    fields = cls(**record)
+    if source is None:
+        return fields
+    element = ET.fromstring(source)
+    if create:
+        for child in list(element):
+            if localname(child.tag) == "id":
+                element.remove(child)
+    obj = cls.from_xml(element)
+    for attr in cls.__slots__:
+        if attr != "id" and getattr(fields, attr) is not None:
+            setattr(obj, attr, getattr(fields, attr))
+    return obj
+
+
+def _mismatch(destination, page_size, object_types):
+    return ValueError("%s holds an unfinished export of %s with page_size %d; rerun it "
+                      "with the same arguments, or remove its checkpoint to start over"
+                      % (destination, ", ".join(object_types), page_size))
+
+
+class JSONLSink(object):
+    """ Append records as JSON lines, one object per line """
+
+    def __init__(self, path, page_size, object_types):
+        self.path = path
+        self.checkpoint_path = path + ".checkpoint"
+        self.state = {"offset": 0, "pages": {}, "page_size": page_size,
+                      "object_types": object_types}
+        if os.path.exists(self.checkpoint_path) and os.path.exists(path):
+            with open(self.checkpoint_path) as f:
+                state = json.load(f)
+            if (state.get("page_size"), state.get("object_types")) != (page_size, object_types):
+                raise _mismatch(path, state.get("page_size") or 0,
+                                state.get("object_types") or list(state["pages"]))
+            self.state = state
+        self._file = open(path, "a+b")
+        self._file.truncate(self.state["offset"])
+        self._file.seek(self.state["offset"])
+
+    def next_page(self, object_type):
+        return self.state["pages"].get(object_type, 1)
+
+    def write_page(self, object_type, records, next_page):
+        self._file.write(b"".join(
+            (json.dumps(dict(record, object_type=object_type), sort_keys=True) + "\n")
+            .encode("utf-8") for record in records))
+        self._file.flush()
+        os.fsync(self._file.fileno())
+        self.state["offset"] = self._file.tell()
+        self.state["pages"][object_type] = next_page
+        tmp = self.checkpoint_path + ".tmp"
+        with open(tmp, "w") as f:
+            json.dump(self.state, f)
+        os.rename(tmp, self.checkpoint_path)
+
+    def close(self, complete):
+        self._file.close()
+        if complete and os.path.exists(self.checkpoint_path):
+            os.remove(self.checkpoint_path)
+
+
+class SQLiteSink(object):
+    """ Store records in an ``objects`` table keyed by (object_type, name) """
+
+    def __init__(self, path, page_size, object_types):
+        self.page_size = page_size
+        self.object_types = json.dumps(object_types)
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        self._db.execute("CREATE TABLE IF NOT EXISTS objects (object_type TEXT, name TEXT, "
+                         "id TEXT, data TEXT, PRIMARY KEY (object_type, name))")
+        self._db.execute("CREATE TABLE IF NOT EXISTS export_checkpoint "
+                         "(object_type TEXT PRIMARY KEY, next_page INTEGER, "
+                         "page_size INTEGER, object_types TEXT)")
+        self._db.commit()
+        row = self._db.execute("SELECT page_size, object_types FROM export_checkpoint "
+                               "WHERE page_size != ? OR object_types != ?",
+                               (self.page_size, self.object_types)).fetchone()
+        if row is not None:
+            self._db.close()
+            raise _mismatch(path, row[0], json.loads(row[1]))
+
+    def next_page(self, object_type):
+        row = self._db.execute("SELECT next_page FROM export_checkpoint WHERE object_type = ?",
+                               (object_type,)).fetchone()
+        return row[0] if row else 1
+
+    def write_page(self, object_type, records, next_page):
+        with self._db:
+            self._db.executemany(
+                "INSERT OR REPLACE INTO objects VALUES (?, ?, ?, ?)",
+                [(object_type, r.get("name"), r.get("id"), json.dumps(r, sort_keys=True))
+                 for r in records])
+            self._db.execute("INSERT OR REPLACE INTO export_checkpoint VALUES (?, ?, ?, ?)",
+                             (object_type, next_page, self.page_size, self.object_types))
+
+    def close(self, complete):
+        if complete:
+            with self._db:
+                self._db.execute("DELETE FROM export_checkpoint")
+        self._db.close()
+
+
+def export(client, destination, object_types=None, workers=4, page_size=500,
+           progress=None):
+    """ Export every object of the given types to JSONL or SQLite
+
+    The format is chosen from the destination extension: .jsonl/.json for
+    JSON lines, anything else for SQLite. Rerunning an interrupted export
+    with the same object types and page size resumes it.
+
+    :param client: Client used to fetch the objects
+    :type client: acsclient.acsclient.ACSClient
+    :param destination: Output file path
+    :type destination: str
+    :param object_types: Object types to export (optional, defaults to
+        devices, device groups, users and hosts)
+    :type object_types: list
+    :param workers: Number of object types fetched in parallel (optional)
+    :type workers: int
+    :param page_size: Objects per request and per checkpoint (optional)
+    :type page_size: int
+    :param progress: Called with (object_type, page, objects on page) after
+        every page (optional)
+    :type progress: callable
+    :returns: Number of objects written per object type in this run
+    :rtype: dict
+    :raises ValueError: if destination holds an unfinished export with other
+        object types or another page size
+    """
+    object_types = object_types or OBJECT_TYPES
+    checkpointed = sorted(set(object_types))
+    if os.path.splitext(destination)[1] in (".jsonl", ".json"):
+        sink = JSONLSink(destination, page_size, checkpointed)
+    else:
+        sink = SQLiteSink(destination, page_size, checkpointed)
+    lock = threading.Lock()
+    query = Query.everything()
+
+    def fetch(object_type):
+        with lock:
+            page = sink.next_page(object_type)
+        written = 0
+        while page:
+            r = client.search(object_type, query, page_size=page_size, page=page)
+            r.raise_for_status()
+            records = [to_record(element) for element in iter_objects(r.content)]
+            next_page = page + 1 if len(records) == page_size else 0
+            with lock:
+                sink.write_page(object_type, records, next_page)
+            written += len(records)
+            if progress is not None:
+                progress(object_type, page, len(records))
+            page = next_page
+        return written
+
+    complete = False
+    try:
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            counts = dict(zip(object_types, executor.map(fetch, object_types)))
+        complete = True
+    finally:
+        sink.close(complete)
+    return counts
+
+
+def main(argv=None):
+    """ Export from the command line, printing progress per page """
+    import argparse
+    from .acsclient import ACSClient
+
+    parser = argparse.ArgumentParser(description="Export Cisco ACS objects")
+    parser.add_argument("hostname")
+    parser.add_argument("username")
+    parser.add_argument("destination", help="Output .jsonl or SQLite file")
+    parser.add_argument("--type", dest="object_types", action="append",
+                        help="Object type to export (repeatable)")
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--page-size", type=int, default=500)
+    args = parser.parse_args(argv)
+
+    password = os.environ.get("ACS_PASSWORD") or getpass.getpass()
+    client = ACSClient(args.hostname, args.username, password, True, max_retries=3)
+
+    def progress(object_type, page, count):
+        sys.stderr.write("%s page %d: %d objects\n" % (object_type, page, count))
+
+    counts = export(client, args.destination, args.object_types, args.workers,
+                    args.page_size, progress)
+    for object_type, count in sorted(counts.items()):
+        print("%s: %d" % (object_type, count))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,161 @@
+import threading
+
+from .bulk import BulkResult, run_bounded
+from .models import DeviceGroup, GroupInfo
+
+
+def _group_info(group):
+    if isinstance(group, dict):
+        return GroupInfo(group["name"], group["type"])
+    return GroupInfo(*group)
+
+
+def _parent(name):
+    return name.rsplit(":", 1)[0] if ":" in name else None
+
+
+class DeviceGroupTree(object):
+    """ Local copy of the NetworkDevice/DeviceGroup hierarchy
+
+    Group names are full paths such as ``All Locations:EMEA:London``. The
+    tree is loaded once with a single streamed read, so device group lists
+    can be checked without a server round trip, and missing groups can be
+    created parent before child with each level in parallel.
+
+    The top level groups (All Locations, All Device Types, ...) belong to
+    the group types defined in ACS and are never created here.
+
+    Example::
+
+        tree = acs.load_device_groups()
+        tree.create_missing([("All Locations:EMEA:London", "Location")])
+
+    :ivar groups: {full name: group type}
+    """
+
+    def __init__(self, client):
+        """ Class initialization method
+
+        :param client: Client used to fetch and create groups
+        :type client: acsclient.acsclient.ACSClient
+        """
+        self.client = client
+        self.groups = {}
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self.groups)
+
+    def __contains__(self, name):
+        return name in self.groups
+
+    def load(self):
+        """ Fetch every device group
+
+        :returns: self
+        :rtype: DeviceGroupTree
+        """
+        groups = {}
+        for element in self.client.iter_read(DeviceGroup.object_type):
+            group = DeviceGroup.from_xml(element, keep_source=False)
+            groups[group.name] = group.group_type
+        with self._lock:
+            self.groups = groups
+        return self
+
+    def add(self, name, group_type):
+        """ Record a group created outside of the tree """
+        with self._lock:
+            self.groups[name] = group_type
+
+    def children(self, name):
+        """ Names of the direct child groups of a group
+
+        :rtype: list
+        """
+        return sorted(child for child in self.groups if _parent(child) == name)
+
+    def missing(self, groups):
+        """ Groups, and their ancestors, that do not exist yet
+
+        :param groups: Device group list as dicts with name and type keys,
+            GroupInfo or (name, type) tuples
+        :type groups: iterable
+        :returns: Missing groups ordered parent before child
+        :rtype: list of GroupInfo
+        """
+        missing = {}
+        for group in groups:
+            name, group_type = _group_info(group)
+            while name is not None and name not in self.groups and name not in missing:
+                missing[name] = GroupInfo(name, group_type)
+                name = _parent(name)
+        return sorted(missing.values(), key=lambda g: (g.name.count(":"), g.name))
+
+    def known(self, group):
+        """ Whether the top level group of a group exists
+
+        Only groups below an existing top level group can be created.
+
+        :param group: Dict with name and type keys, GroupInfo or tuple
+        :rtype: boolean
+        """
+        return _group_info(group).name.split(":", 1)[0] in self.groups
+
+    def validate(self, groups):
+        """ Check that every group exists
+
+        :param groups: Device group list (see missing)
+        :type groups: iterable
+        :raises ValueError: naming the groups that do not exist
+        """
+        missing = [g.name for g in self.missing(groups)]
+        if missing:
+            raise ValueError("Unknown device group(s): %s" % ", ".join(missing))
+
+    def create_missing(self, groups, workers=8, progress=None):
+        """ Create the groups that do not exist yet, one level at a time
+
+        Each level is created in parallel once the level above it is done.
+        Groups below a group that could not be created are not attempted and
+        are reported as failed.
+
+        :param groups: Device group list (see missing)
+        :type groups: iterable
+        :param workers: Number of parallel requests (optional)
+        :type workers: int
+        :param progress: Called with a BulkProgress after each group (optional)
+        :type progress: callable
+        :returns: BulkResult per missing group, with the GroupInfo as record
+        :rtype: list
+        :raises ValueError: if a top level group is missing
+        """
+        missing = self.missing(groups)
+        roots = [g.name for g in missing if _parent(g.name) is None]
+        if roots:
+            raise ValueError("Unknown device group type(s): %s" % ", ".join(roots))
+        levels = {}
+        for group in missing:
+            levels.setdefault(group.name.count(":"), []).append(group)
+
+        def create(group):
+            return self.client.create_device_group(group.name, group.type)
+
+        results = []
+        failed = set()
+        for depth in sorted(levels):
+            level = []
+            for group in levels[depth]:
+                if _parent(group.name) in failed:
+                    failed.add(group.name)
+                    results.append(BulkResult(group, None, "Parent group %s was not created"
+                                              % _parent(group.name), 0.0))
+                else:
+                    level.append(group)
+            for result in run_bounded(create, level, workers, progress=progress):
+                if result.ok:
+                    self.add(*result.record)
+                else:
+                    failed.add(result.record.name)
+                results.append(result)
+        return results
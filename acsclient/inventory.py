@@ -0,0 +1,167 @@
+import ipaddress
+
+from .models import Device
+
+
+class Inventory(object):
+    """ Local snapshot of every NetworkDevice/Device with fast lookups
+
+    Devices are loaded once with a single streamed read and indexed by name,
+    by group and by subnet. IP lookups are answered locally: subnets are kept
+    in one hash table per prefix length, so a longest-prefix match costs one
+    dict probe per distinct prefix length in use.
+
+    Devices are stored without their source XML to keep large snapshots
+    small; read a device again before writing it back.
+
+    Example::
+
+        inventory = Inventory(acs).load()
+        device = inventory.longest_match("10.1.1.17")
+    """
+
+    def __init__(self, client):
+        """ Class initialization method
+
+        :param client: Client used to fetch devices
+        :type client: acsclient.acsclient.ACSClient
+        """
+        self.client = client
+        self._reset()
+
+    def _reset(self):
+        self.devices = {}
+        self._groups = {}
+        self._addresses = {}
+        # {version: {prefixlen: {network address as int: set(names)}}}
+        self._prefixes = {4: {}, 6: {}}
+        self._lengths = {4: [], 6: []}
+
+    def __len__(self):
+        return len(self.devices)
+
+    def __contains__(self, name):
+        return name in self.devices
+
+    def load(self):
+        """ Fetch every device and rebuild the indexes
+
+        :returns: self
+        :rtype: Inventory
+        """
+        self._reset()
+        for element in self.client.iter_read(Device.object_type):
+            self._add(Device.from_xml(element, keep_source=False))
+        return self
+
+    def refresh(self):
+        """ Re-fetch the devices and apply only the differences
+
+        Unchanged devices keep their index entries; added, changed and
+        removed devices are indexed or unindexed one by one.
+
+        :returns: (added, changed, removed) device names
+        :rtype: tuple
+        """
+        added, changed = [], []
+        seen = set()
+        for element in self.client.iter_read(Device.object_type):
+            device = Device.from_xml(element, keep_source=False)
+            seen.add(device.name)
+            current = self.devices.get(device.name)
+            if current is None:
+                added.append(device.name)
+            elif current != device:
+                changed.append(device.name)
+                self._remove(current)
+            else:
+                continue
+            self._add(device)
+        removed = [name for name in self.devices if name not in seen]
+        for name in removed:
+            self._remove(self.devices[name])
+        return added, changed, removed
+
+    def get(self, name):
+        """ Return the device called name, or None
+
+        :param name: Device name
+        :type name: str or unicode
+        :rtype: acsclient.models.Device
+        """
+        return self.devices.get(name)
+
+    def in_group(self, group):
+        """ Return the devices that are members of a device group
+
+        :param group: Full group name, e.g. All Locations:Site
+        :type group: str or unicode
+        :rtype: list
+        """
+        return [self.devices[name] for name in self._groups.get(group, ())]
+
+    def exact(self, ip):
+        """ Return the devices configured with exactly this IP address
+
+        :param ip: IP address
+        :type ip: str or unicode
+        :rtype: list
+        """
+        key = ipaddress.ip_address(u"%s" % ip)
+        return [self.devices[name] for name in self._addresses.get(key, ())]
+
+    def longest_match(self, ip):
+        """ Return the devices whose subnet is the most specific match for ip
+
+        :param ip: IP address
+        :type ip: str or unicode
+        :returns: Matching devices, empty if no subnet contains ip
+        :rtype: list
+        """
+        address = ipaddress.ip_address(u"%s" % ip)
+        value = int(address)
+        bits = address.max_prefixlen
+        tables = self._prefixes[address.version]
+        for length in self._lengths[address.version]:
+            names = tables[length].get(value >> (bits - length) << (bits - length))
+            if names:
+                return [self.devices[name] for name in names]
+        return []
+
+    def _networks(self, device):
+        for subnet in device.subnets:
+            try:
+                yield ipaddress.ip_network(u"%s/%s" % (subnet.ip, subnet.mask),
+                                           strict=False), subnet.ip
+            except ValueError:
+                continue
+
+    def _add(self, device):
+        self.devices[device.name] = device
+        for group in device.groups:
+            self._groups.setdefault(group.name, set()).add(device.name)
+        for network, ip in self._networks(device):
+            self._addresses.setdefault(ipaddress.ip_address(u"%s" % ip), set()).add(device.name)
+            tables = self._prefixes[network.version]
+            if network.prefixlen not in tables:
+                tables[network.prefixlen] = {}
+                self._lengths[network.version] = sorted(tables, reverse=True)
+            tables[network.prefixlen].setdefault(
+                int(network.network_address), set()).add(device.name)
+
+    def _remove(self, device):
+        del self.devices[device.name]
+        for group in device.groups:
+            _discard(self._groups, group.name, device.name)
+        for network, ip in self._networks(device):
+            _discard(self._addresses, ipaddress.ip_address(u"%s" % ip), device.name)
+            table = self._prefixes[network.version].get(network.prefixlen, {})
+            _discard(table, int(network.network_address), device.name)
+
+
+def _discard(index, key, name):
+    names = index.get(key)
+    if names is not None:
+        names.discard(name)
+        if not names:
+            del index[key]
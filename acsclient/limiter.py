@@ -0,0 +1,120 @@
+import threading
+import time
+from collections import deque
+
+
+class AdaptiveLimiter(object):
+    """ AIMD concurrency limit driven by ACS latency and errors
+
+    Every request takes a slot before it is sent. While latency stays within
+    ``tolerance`` times the baseline (the lowest recent latency), the limit
+    grows by ``increase`` per limit's worth of successful requests. When
+    latency climbs past that, or ACS answers 429/5xx, or the connection
+    fails, the limit is multiplied by ``decrease``, at most once per
+    baseline round trip, so one burst of errors does not collapse it.
+
+    Pass it to ACSClient(limiter=...) and run bulk jobs with as many workers
+    as max_limit; threads beyond the current limit wait for a slot.
+
+    :ivar limit: Current concurrency limit
+    :ivar in_flight: Requests currently holding a slot
+    :ivar baseline: Reference latency in seconds
+    :ivar completed: Requests finished
+    :ivar overloads: Requests that counted as overload signals
+    """
+
+    def __init__(self, initial=4, min_limit=1, max_limit=64, increase=1.0,
+                 decrease=0.7, tolerance=2.0, drift=0.01, window=10.0):
+        """ Class initialization method
+
+        :param initial: Starting limit (optional)
+        :type initial: int
+        :param min_limit: Lowest limit (optional)
+        :type min_limit: int
+        :param max_limit: Highest limit (optional)
+        :type max_limit: int
+        :param increase: Additive increase per limit's worth of successes
+            (optional)
+        :type increase: float
+        :param decrease: Multiplicative decrease on overload (optional)
+        :type decrease: float
+        :param tolerance: Latency above baseline * tolerance is an overload
+            signal (optional)
+        :type tolerance: float
+        :param drift: Fraction the baseline may rise per request, so it
+            follows lasting latency changes (optional)
+        :type drift: float
+        :param window: Seconds over which throughput is measured (optional)
+        :type window: float
+        """
+        self.limit = float(initial)
+        self.min_limit = min_limit
+        self.max_limit = max_limit
+        self.increase = increase
+        self.decrease = decrease
+        self.tolerance = tolerance
+        self.drift = drift
+        self.window = window
+        self.in_flight = 0
+        self.baseline = None
+        self.completed = 0
+        self.overloads = 0
+        self._last_decrease = 0.0
+        self._finished = deque()
+        self._cond = threading.Condition()
+
+    def acquire(self):
+        """ Wait for a free slot """
+        with self._cond:
+            while self.in_flight >= max(self.min_limit, int(self.limit)):
+                self._cond.wait()
+            self.in_flight += 1
+
+    def release(self, latency, overloaded=False):
+        """ Free a slot and adjust the limit
+
+        :param latency: Seconds the request took
+        :type latency: float
+        :param overloaded: True for 429/5xx responses and transport errors
+        :type overloaded: boolean
+        """
+        now = time.time()
+        with self._cond:
+            self.in_flight -= 1
+            self.completed += 1
+            self._finished.append(now)
+            while self._finished and self._finished[0] < now - self.window:
+                self._finished.popleft()
+            if not overloaded:
+                if self.baseline is None or latency < self.baseline:
+                    self.baseline = latency
+                else:
+                    self.baseline *= 1 + self.drift
+                overloaded = latency > self.baseline * self.tolerance
+            if overloaded:
+                self.overloads += 1
+                if now - self._last_decrease > (self.baseline or 0):
+                    self.limit = max(self.min_limit, self.limit * self.decrease)
+                    self._last_decrease = now
+            else:
+                self.limit = min(self.max_limit, self.limit + self.increase / self.limit)
+            self._cond.notify_all()
+
+    @property
+    def throughput(self):
+        """ Requests completed per second over the last window """
+        with self._cond:
+            now = time.time()
+            recent = [t for t in self._finished if t >= now - self.window]
+        if not recent:
+            return 0.0
+        return len(recent) / min(self.window, max(now - recent[0], 1e-3))
+
+    def stats(self):
+        """ Snapshot of the limiter state for monitoring
+
+        :rtype: dict
+        """
+        return dict(limit=self.limit, in_flight=self.in_flight,
+                    throughput=self.throughput, baseline=self.baseline,
+                    completed=self.completed, overloads=self.overloads)
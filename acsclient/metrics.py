@@ -0,0 +1,146 @@
+import threading
+from bisect import bisect_left
+from collections import namedtuple
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+
+class RequestEvent(namedtuple("RequestEvent", "method object_type url status bytes_sent "
+                                              "bytes_received retries render connect wait "
+                                              "transfer total error")):
+    """ Details of one ACSClient request, passed to every hook
+
+    :ivar method: HTTP method, or QUERY for op/query searches
+    :ivar object_type: Cisco ACS Object Type the request was for
+    :ivar url: Full request URL
+    :ivar status: HTTP status code, None if no response was received
+    :ivar bytes_sent: Size of the request body
+    :ivar bytes_received: Size of the response body (Content-Length for
+        streamed responses)
+    :ivar retries: Number of retries made for this request
+    :ivar render: Seconds spent building the payload (templates or models)
+    :ivar connect: Seconds spent opening new connections (TCP connect and
+        TLS handshake), 0 when a pooled connection was reused
+    :ivar wait: Seconds from sending the request until the response headers
+        were parsed, excluding connect
+    :ivar transfer: Seconds spent reading the response body, plus any
+        backoff between retries
+    :ivar total: Seconds for the whole request, including render and retries
+    :ivar error: Exception raised by the transport, None otherwise
+    """
+    __slots__ = ()
+
+
+class Histogram(object):
+    """ Cumulative histogram with fixed upper bounds """
+
+    def __init__(self, buckets=DEFAULT_BUCKETS):
+        self.buckets = tuple(buckets)
+        self.counts = [0] * (len(self.buckets) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value):
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+    def cumulative(self):
+        """ Yield (upper bound, cumulative count), ending with +Inf """
+        total = 0
+        for bound, count in zip(self.buckets + (float("inf"),), self.counts):
+            total += count
+            yield bound, total
+
+
+class Metrics(object):
+    """ Latency histograms and counters built from RequestEvents
+
+    Register it as a hook (ACSClient does this when created with
+    metrics=True) and export with to_prometheus().
+    """
+
+    def __init__(self, buckets=DEFAULT_BUCKETS):
+        self.buckets = buckets
+        self.durations = {}
+        self.renders = {}
+        self.connects = {}
+        self.requests = {}
+        self.bytes_sent = {}
+        self.bytes_received = {}
+        self.retries = 0
+        self._lock = threading.Lock()
+
+    def __call__(self, event):
+        self.record(event)
+
+    def record(self, event):
+        """ Add a RequestEvent to the metrics
+
+        :param event: Event passed to ACSClient hooks
+        :type event: acsclient.metrics.RequestEvent
+        """
+        key = (event.method, event.object_type)
+        status = str(event.status) if event.status is not None else "error"
+        with self._lock:
+            if key not in self.durations:
+                self.durations[key] = Histogram(self.buckets)
+                self.renders[key] = Histogram(self.buckets)
+                self.connects[key] = Histogram(self.buckets)
+            self.durations[key].observe(event.total)
+            if event.render:
+                self.renders[key].observe(event.render)
+            if event.connect:
+                self.connects[key].observe(event.connect)
+            count_key = key + (status,)
+            self.requests[count_key] = self.requests.get(count_key, 0) + 1
+            self.bytes_sent[key] = self.bytes_sent.get(key, 0) + event.bytes_sent
+            self.bytes_received[key] = self.bytes_received.get(key, 0) + event.bytes_received
+            self.retries += event.retries
+
+    def to_prometheus(self, prefix="acsclient"):
+        """ Render the metrics in the Prometheus text exposition format
+
+        :param prefix: Metric name prefix (optional)
+        :type prefix: str
+        :rtype: str
+        """
+        lines = []
+        with self._lock:
+            for name, help_text, histograms in (
+                    ("request_duration_seconds", "Time per request, including retries",
+                     self.durations),
+                    ("render_duration_seconds", "Time spent building request payloads",
+                     self.renders),
+                    ("connect_duration_seconds",
+                     "Time spent opening connections, including TLS", self.connects)):
+                lines.append("# HELP %s_%s %s" % (prefix, name, help_text))
+                lines.append("# TYPE %s_%s histogram" % (prefix, name))
+                for key in sorted(histograms):
+                    labels = _labels(key)
+                    histogram = histograms[key]
+                    for bound, total in histogram.cumulative():
+                        lines.append('%s_%s_bucket{%s,le="%s"} %d' % (
+                            prefix, name, labels, "+Inf" if bound == float("inf") else bound,
+                            total))
+                    lines.append("%s_%s_sum{%s} %r" % (prefix, name, labels, histogram.sum))
+                    lines.append("%s_%s_count{%s} %d" % (prefix, name, labels, histogram.count))
+            lines.append("# HELP %s_requests_total Requests by status" % prefix)
+            lines.append("# TYPE %s_requests_total counter" % prefix)
+            for key in sorted(self.requests):
+                lines.append('%s_requests_total{%s,status="%s"} %d' % (
+                    prefix, _labels(key[:2]), key[2], self.requests[key]))
+            for name, counts in (("sent", self.bytes_sent), ("received", self.bytes_received)):
+                lines.append("# HELP %s_bytes_%s_total Body bytes %s" % (prefix, name, name))
+                lines.append("# TYPE %s_bytes_%s_total counter" % (prefix, name))
+                for key in sorted(counts):
+                    lines.append("%s_bytes_%s_total{%s} %d" % (
+                        prefix, name, _labels(key), counts[key]))
+            lines.append("# HELP %s_retries_total Retried requests" % prefix)
+            lines.append("# TYPE %s_retries_total counter" % prefix)
+            lines.append("%s_retries_total %d" % (prefix, self.retries))
+        return "\n".join(lines) + "\n"
+
+
+def _labels(key):
+    return 'method="%s",object_type="%s"' % key
@@ -0,0 +1,344 @@
+"""
+In-process stand-in for the Cisco ACS 5.x REST API
+
+Serves the endpoints ACSClient uses (read all/name/id, create, update,
+delete and paged op/query searches) over plain HTTP from an in-memory store,
+with optional latency and error injection. It is meant for benchmarks and
+experiments without an appliance, not for checking ACS server behaviour.
+
+Example::
+
+    with MockACSServer(latency=0.005) as server:
+        acs = server.client()
+        acs.create_device_simple("ROUTER01", "s3cr37", "10.1.1.1", "Site", "Router")
+        print(acs.read("NetworkDevice/Device", "name", "ROUTER01").content)
+"""
+import random
+import sys
+import threading
+import time
+import xml.etree.ElementTree as ET
+from collections import OrderedDict
+
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import unquote
+
+from .models import IDENTITY_NS, NETWORK_DEVICE_NS, Device
+from .parse import localname
+
+COMMON_NS = "common.rest.mgmt.acs.nm.cisco.com"
+XSI_TYPE = "{http://www.w3.org/2001/XMLSchema-instance}type"
+
+# object type: (list element, namespace)
+_LISTS = {
+    "NetworkDevice/Device": ("devices", NETWORK_DEVICE_NS),
+    "NetworkDevice/DeviceGroup": ("deviceGroups", NETWORK_DEVICE_NS),
+    "Identity/User": ("users", IDENTITY_NS),
+    "Identity/IdentityGroup": ("identityGroups", IDENTITY_NS),
+    "Host": ("hosts", IDENTITY_NS),
+}
+
+_CONDITIONS = {
+    "CONTAINS": lambda have, want: want in have,
+    "DOES_NOT_CONTAIN": lambda have, want: want not in have,
+    "ENDS_WITH": lambda have, want: have.endswith(want),
+    "EQUALS": lambda have, want: have == want,
+    "NOT_EMPTY": lambda have, want: have != "",
+    "NOT_EQUALS": lambda have, want: have != want,
+    "STARTS_WITH": lambda have, want: have.startswith(want),
+}
+
+
+def _text(element, name):
+    for child in element.iter():
+        if localname(child.tag) == name:
+            return child.text or ""
+    return ""
+
+
+def _set_id(element, id_):
+    for child in list(element):
+        if localname(child.tag) == "id":
+            element.remove(child)
+    id_element = ET.Element("id")
+    id_element.text = id_
+    element.insert(1, id_element)
+
+
+def _error(code, message):
+    return code, ('<ns1:errorMessage xmlns:ns1="%s"><code>%d</code><message>%s</message>'
+                  '</ns1:errorMessage>' % (COMMON_NS, code, message)).encode("utf-8")
+
+
+class MockACSServer(object):
+    """ Threaded HTTP server emulating the ACS REST endpoints
+
+    :ivar requests: Number of requests served
+    """
+
+    def __init__(self, latency=0.0, jitter=0.0, error_rate=0.0, seed=None,
+                 host="127.0.0.1", port=0):
+        """ Class initialization method
+
+        :param latency: Seconds added to every response (optional)
+        :type latency: float
+        :param jitter: Up to this many extra seconds, uniformly random (optional)
+        :type jitter: float
+        :param error_rate: Fraction of requests answered with a 500 error (optional)
+        :type error_rate: float
+        :param seed: Seed for the latency and error randomness (optional)
+        :type seed: int
+        :param host: Address to listen on (optional)
+        :type host: str
+        :param port: Port to listen on, 0 picks a free one (optional)
+        :type port: int
+        """
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.requests = 0
+        self._random = random.Random(seed)
+        self._store = dict((object_type, OrderedDict()) for object_type in _LISTS)
+        self._ids = {}
+        self._next_id = 1
+        # Matches of recent searches, reused while the store is unchanged so
+        # that each further page costs a slice instead of a full scan
+        self._versions = dict((object_type, 0) for object_type in _LISTS)
+        self._queries = OrderedDict()
+        self._lock = threading.Lock()
+        self._httpd = ThreadingHTTPServer((host, port), _Handler)
+        self._httpd.daemon_threads = True
+        self._httpd.acs = self
+        self._thread = None
+
+    @property
+    def hostname(self):
+        """ host:port to pass to ACSClient """
+        return "%s:%d" % self._httpd.server_address[:2]
+
+    def client(self, **kwargs):
+        """ Return an ACSClient talking to this server
+
+        Keyword arguments are passed to ACSClient.
+
+        :rtype: acsclient.acsclient.ACSClient
+        """
+        from .acsclient import ACSClient
+        return ACSClient(self.hostname, "admin", "admin", scheme="http", **kwargs)
+
+    def start(self):
+        """ Serve requests on a background thread
+
+        :returns: self
+        """
+        self._thread = threading.Thread(target=self._httpd.serve_forever)
+        self._thread.daemon = True
+        self._thread.start()
+        return self
+
+    def stop(self):
+        """ Stop serving and close the socket """
+        self._httpd.shutdown()
+        self._httpd.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+    def add(self, object_type, obj):
+        """ Store an object directly, bypassing HTTP
+
+        :param object_type: Cisco ACS Object Type
+        :type object_type: str
+        :param obj: Model object or XML document
+        :type obj: acsclient.models.Model, str or bytes
+        """
+        if hasattr(obj, "to_xml"):
+            obj = obj.to_xml()
+        return self._create(object_type, ET.fromstring(obj))
+
+    def count(self, object_type):
+        """ Number of stored objects of a type """
+        return len(self._store[object_type])
+
+    def _create(self, object_type, element):
+        name = _text(element, "name")
+        with self._lock:
+            store = self._store[object_type]
+            if name in store:
+                return _error(400, "Object %s already exists" % name)
+            id_ = str(self._next_id)
+            self._next_id += 1
+            _set_id(element, id_)
+            store[name] = (element, ET.tostring(element))
+            self._ids[(object_type, id_)] = name
+            self._versions[object_type] += 1
+        return 201, b""
+
+    def _update(self, object_type, element):
+        name = _text(element, "name")
+        with self._lock:
+            store = self._store[object_type]
+            if name not in store:
+                return _error(404, "Object %s not found" % name)
+            id_ = _text(store[name][0], "id")
+            _set_id(element, id_)
+            store[name] = (element, ET.tostring(element))
+            self._versions[object_type] += 1
+        return 200, b""
+
+    def _lookup(self, object_type, func, var):
+        name = var if func == "name" else self._ids.get((object_type, var))
+        return name, self._store[object_type].get(name)
+
+    def _delete(self, object_type, func, var):
+        with self._lock:
+            name, entry = self._lookup(object_type, func, var)
+            if entry is None:
+                return _error(404, "Object %s not found" % var)
+            del self._store[object_type][name]
+            self._ids.pop((object_type, _text(entry[0], "id")), None)
+            self._versions[object_type] += 1
+        return 200, b""
+
+    def _list(self, object_type, entries):
+        tag, ns = _LISTS[object_type]
+        return 200, b"".join([('<ns1:%s xmlns:ns1="%s">' % (tag, ns)).encode("utf-8")] +
+                             [entry[1] for entry in entries] +
+                             [("</ns1:%s>" % tag).encode("utf-8")])
+
+    def _query(self, object_type, body):
+        query = ET.fromstring(body)
+        criteria = query.find("criteria")
+        any_of = criteria.get(XSI_TYPE, "").endswith("OrFilter")
+        filters = tuple((f.findtext("propertyName"), f.findtext("operation"),
+                         f.findtext("value") or "") for f in criteria.findall("simpleFilters"))
+        size = int(query.findtext("numberofItemsInPage") or 100)
+        start = (int(query.findtext("startPageNumber") or 1) - 1) * size
+        key = (object_type, any_of, filters)
+        with self._lock:
+            version = self._versions[object_type]
+            cached = self._queries.get(key)
+            if cached is None or cached[0] != version:
+                entries = list(self._store[object_type].values())
+        if cached is None or cached[0] != version:
+            match = any if any_of else all
+            tests = [(name, _CONDITIONS[operation], value)
+                     for name, operation, value in filters]
+            matches = [entry for entry in entries
+                       if match(test(_text(entry[0], name), value)
+                                for name, test, value in tests)]
+            with self._lock:
+                self._queries[key] = cached = (version, matches)
+                while len(self._queries) > 16:
+                    self._queries.popitem(last=False)
+        return self._list(object_type, cached[1][start:start + size])
+
+    def handle(self, method, path, body):
+        """ Produce (status, body) for a request path below /Rest/ """
+        with self._lock:
+            self.requests += 1
+            delay = self.latency + self._random.uniform(0, self.jitter)
+            fail = self._random.random() < self.error_rate
+        if delay:
+            time.sleep(delay)
+        if fail:
+            return _error(500, "Injected error")
+        if path == "Common/AcsVersion":
+            return 200, ('<ns1:acsVersion xmlns:ns1="%s"><version>5.8</version>'
+                         '</ns1:acsVersion>' % COMMON_NS).encode("utf-8")
+        for object_type in _LISTS:
+            if path == object_type or path.startswith(object_type + "/"):
+                break
+        else:
+            return _error(404, "Unknown resource %s" % path)
+        rest = path[len(object_type) + 1:].split("/", 1)
+        try:
+            if rest == [""]:
+                if method == "GET":
+                    with self._lock:
+                        entries = list(self._store[object_type].values())
+                    return self._list(object_type, entries)
+                if method == "POST":
+                    return self._create(object_type, ET.fromstring(body))
+                if method == "PUT":
+                    return self._update(object_type, ET.fromstring(body))
+            elif rest == ["op", "query"] and method == "PUT":
+                return self._query(object_type, body)
+            elif len(rest) == 2 and rest[0] in ("name", "id"):
+                var = unquote(rest[1])
+                if method == "GET":
+                    entry = self._lookup(object_type, rest[0], var)[1]
+                    if entry is None:
+                        return _error(404, "Object %s not found" % var)
+                    return 200, entry[1]
+                if method == "DELETE":
+                    return self._delete(object_type, rest[0], var)
+        except (ET.ParseError, AttributeError, KeyError, ValueError) as e:
+            return _error(400, "Bad request: %s" % e)
+        return _error(405, "Unsupported %s %s" % (method, path))
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    disable_nagle_algorithm = True
+
+    def _respond(self):
+        length = int(self.headers.get("Content-Length") or 0)
+        body = self.rfile.read(length) if length else b""
+        path = self.path.split("?", 1)[0]
+        if not path.startswith("/Rest/"):
+            status, payload = _error(404, "Unknown resource %s" % path)
+        else:
+            status, payload = self.server.acs.handle(self.command, path[len("/Rest/"):], body)
+        self.send_response(status)
+        self.send_header("Content-Type", "application/xml")
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    do_GET = do_POST = do_PUT = do_DELETE = _respond
+
+    def log_message(self, format, *args):
+        pass
+
+
+def main(argv=None):
+    """ Run a mock server from the command line until interrupted
+
+    ``python -m acsclient.mockserver --devices 10000 --latency 0.005``
+    """
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Mock Cisco ACS REST server")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=0)
+    parser.add_argument("--latency", type=float, default=0.0)
+    parser.add_argument("--jitter", type=float, default=0.0)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--seed", type=int)
+    parser.add_argument("--devices", type=int, default=0,
+                        help="Number of devices to preload")
+    args = parser.parse_args(argv)
+
+    server = MockACSServer(args.latency, args.jitter, args.error_rate, args.seed,
+                           args.host, args.port)
+    for i in range(args.devices):
+        server.add("NetworkDevice/Device", Device(
+            name="DEV%06d" % i, tacacs_secret="s3cr37",
+            groups=[("All Locations:SITE%03d" % (i % 100), "Location"),
+                    ("All Device Types:Router", "Device Type")],
+            subnets=[("10.%d.%d.%d" % (i >> 16 & 255, i >> 8 & 255, i & 255), 32)]))
+    print("Listening on %s" % server.hostname)
+    sys.stdout.flush()
+    try:
+        server._httpd.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    server._httpd.server_close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,434 @@
+import xml.etree.ElementTree as ET
+from collections import namedtuple
+from xml.sax.saxutils import escape
+
+from .parse import localname
+
+NETWORK_DEVICE_NS = "networkdevice.rest.mgmt.acs.nm.cisco.com"
+IDENTITY_NS = "identity.rest.mgmt.acs.nm.cisco.com"
+
+GroupInfo = namedtuple("GroupInfo", "name type")
+Subnet = namedtuple("Subnet", "ip mask")
+
+
+def _to_bool(text):
+    return None if text is None else text.strip().lower() == "true"
+
+
+def _from_bool(value):
+    return "true" if value else "false"
+
+
+def _text_element(parts, name, value):
+    parts.append("<%s>%s</%s>" % (name, escape(str(value)), name))
+
+
+def _serialize(element, parts):
+    tag = element.tag
+    if element.keys() or tag[:1] == "{":
+        raise ValueError(tag)
+    parts.append("<%s>" % tag)
+    if element.text:
+        parts.append(escape(element.text))
+    for child in element:
+        _serialize(child, parts)
+        if child.tail:
+            parts.append(escape(child.tail))
+    parts.append("</%s>" % tag)
+
+
+def _tostring(element):
+    """ Serialize an object element, about twice as fast as ET.tostring
+
+    ACS objects are a namespaced root with plain child elements. Anything
+    else (attributes, namespaced children) goes through ET.tostring.
+    """
+    if element.keys() or element.tag[:1] != "{":
+        return ET.tostring(element, encoding="unicode")
+    ns, tag = element.tag[1:].split("}", 1)
+    parts = ['<ns1:%s xmlns:ns1="%s">' % (tag, ns)]
+    if element.text:
+        parts.append(escape(element.text))
+    try:
+        for child in element:
+            _serialize(child, parts)
+            if child.tail:
+                parts.append(escape(child.tail))
+    except ValueError:
+        return ET.tostring(element, encoding="unicode")
+    parts.append("</ns1:%s>" % tag)
+    return "".join(parts)
+
+
+def _fragment(write):
+    """ Parse the elements a _write style function appends to parts """
+    parts = ["<fragment>"]
+    write(parts)
+    parts.append("</fragment>")
+    return list(ET.fromstring("".join(parts)))
+
+
+def _children(element, tag):
+    return [child for child in element if localname(child.tag) == tag]
+
+
+def _replace_children(element, tag, new, after=()):
+    """ Replace every ``tag`` child by the elements in new
+
+    The new children take the place of the first old one, or follow the last
+    child named in ``after`` when there was none.
+    """
+    old = _children(element, tag)
+    items = list(element)
+    if old:
+        index = items.index(old[0])
+    else:
+        index = max([i + 1 for i, child in enumerate(items)
+                     if localname(child.tag) in after] or [0])
+    for child in old:
+        element.remove(child)
+    for offset, child in enumerate(new):
+        element.insert(index + offset, child)
+
+
+class Model(object):
+    """ Base class for ACS objects
+
+    Subclasses list their simple child elements in ``_fields`` as
+    ``(attribute, element name, is boolean)`` and override _read, _write and
+    _patch for anything nested.
+
+    Objects built with from_xml keep the XML they were read from as a string,
+    with a snapshot of their attributes. to_xml returns that string as is
+    while no attribute changed, and otherwise parses it and sets only the
+    modeled fields, so settings the model does not cover survive an update.
+    Objects built from keyword arguments are written from scratch, with the
+    defaults of the payload templates, which suits creates.
+    """
+    __slots__ = ("_source",)
+    object_type = None
+    _ns = None
+    _tag = None
+    _fields = ()
+
+    def __init__(self, **kwargs):
+        self._source = None
+        for attr in self.__slots__:
+            setattr(self, attr, kwargs.pop(attr, None))
+        if kwargs:
+            raise TypeError("Unknown %s attribute(s): %s"
+                            % (type(self).__name__, ", ".join(sorted(kwargs))))
+
+    @classmethod
+    def from_xml(cls, source, keep_source=True):
+        """ Build an object from XML
+
+        :param source: XML element or document
+        :type source: xml.etree.ElementTree.Element, bytes or str
+        :param keep_source: Keep the XML so that to_xml writes back the
+            settings the model does not cover. Readers that never write the
+            object back can skip it to save time and memory (optional)
+        :type keep_source: boolean
+        :returns: Model instance
+        """
+        if not ET.iselement(source):
+            source = ET.fromstring(source)
+        obj = cls()
+        fields = dict((tag, (attr, is_bool)) for attr, tag, is_bool in cls._fields)
+        for child in source:
+            tag = localname(child.tag)
+            if tag in fields:
+                attr, is_bool = fields[tag]
+                setattr(obj, attr, _to_bool(child.text) if is_bool else child.text)
+            else:
+                obj._read(tag, child)
+        obj._loaded()
+        if keep_source:
+            obj._source = (_tostring(source), obj._state())
+        return obj
+
+    @classmethod
+    def patch(cls, source, **values):
+        """ Build an object that writes source back with only values changed
+
+        The attributes not given stay None, so to_xml leaves their elements
+        exactly as they are in source. The name is kept for reference.
+
+        :param source: XML element or document of an existing object
+        :type source: xml.etree.ElementTree.Element, bytes or str
+        :returns: Model instance
+        :raises TypeError: for attributes the model does not have
+        """
+        if not ET.iselement(source):
+            source = ET.fromstring(source)
+        if "name" not in values:
+            values["name"] = source.findtext("name")
+        obj = cls(**values)
+        obj._source = (_tostring(source), None)
+        return obj
+
+    def to_xml(self):
+        """ Serialize the object to an XML payload for the ACS Server
+
+        :rtype: str
+        """
+        if self._source is not None:
+            if not self._changed():
+                return self._source[0]
+            return _tostring(self.to_element())
+        parts = ['<ns1:%s xmlns:ns1="%s">' % (self._tag, self._ns)]
+        for attr, tag, is_bool in self._fields:
+            value = getattr(self, attr)
+            if value is None:
+                if tag != "description":
+                    continue
+                value = ""
+            _text_element(parts, tag, _from_bool(value) if is_bool else value)
+        self._write(parts)
+        parts.append("</ns1:%s>" % self._tag)
+        return "".join(parts)
+
+    def to_element(self):
+        """ Serialize the object to an XML element
+
+        :rtype: xml.etree.ElementTree.Element
+        """
+        if self._source is None:
+            return ET.fromstring(self.to_xml())
+        element = ET.fromstring(self._source[0])
+        changed = self._changed()
+        tags = [tag for _, tag, _ in self._fields]
+        for attr, tag, is_bool in self._fields:
+            value = getattr(self, attr)
+            if value is None or attr not in changed:
+                continue
+            children = _children(element, tag)
+            if children:
+                child = children[0]
+            else:
+                child = ET.Element(tag)
+                _replace_children(element, tag, [child], tags[:tags.index(tag)])
+            child.text = _from_bool(value) if is_bool else str(value)
+        self._patch(element, changed)
+        return element
+
+    def to_dict(self):
+        """ Return the object attributes as a plain dict
+
+        :rtype: dict
+        """
+        return dict((attr, getattr(self, attr)) for attr in self.__slots__)
+
+    def _state(self):
+        return tuple(tuple(value) if isinstance(value, list) else value
+                     for value in (getattr(self, attr) for attr in self.__slots__))
+
+    def _changed(self):
+        """ Attributes that differ from the XML the object was read from
+
+        Objects built with patch have no snapshot; every attribute that is
+        set counts as changed.
+        """
+        state = self._source[1]
+        current = self._state()
+        if state is None:
+            return set(attr for attr, value in zip(self.__slots__, current)
+                       if value is not None)
+        return set(attr for attr, old, new in zip(self.__slots__, state, current)
+                   if old != new)
+
+    def _read(self, tag, element):
+        pass
+
+    def _loaded(self):
+        pass
+
+    def _write(self, parts):
+        pass
+
+    def _patch(self, element, changed):
+        pass
+
+    def __eq__(self, other):
+        return type(self) is type(other) and self.to_dict() == other.to_dict()
+
+    def __ne__(self, other):
+        return not self == other
+
+    def __repr__(self):
+        return "<%s %r>" % (type(self).__name__, self.name)
+
+
+class Device(Model):
+    """ NetworkDevice/Device
+
+    ``groups`` is a list of GroupInfo and ``subnets`` a list of Subnet; both
+    stay None when not given, meaning "not set". Setting ``tacacs_secret``
+    or ``radius_secret`` on a new device adds the matching connection
+    settings, with the same defaults as device.j2 and radius_device.j2. On a
+    device read with from_xml only the shared secret is changed and the
+    other connection settings are kept.
+    """
+    __slots__ = ("id", "name", "description", "groups", "subnets",
+                 "tacacs_secret", "radius_secret")
+    object_type = "NetworkDevice/Device"
+    _ns = NETWORK_DEVICE_NS
+    _tag = "device"
+    _fields = (("description", "description", False),
+               ("id", "id", False),
+               ("name", "name", False))
+
+    def __init__(self, **kwargs):
+        super(Device, self).__init__(**kwargs)
+        if self.groups is not None:
+            self.groups = [GroupInfo(g["name"], g["type"]) if isinstance(g, dict)
+                           else GroupInfo(*g) for g in self.groups]
+        if self.subnets is not None:
+            self.subnets = [Subnet(s["ip"], s["mask"]) if isinstance(s, dict)
+                            else Subnet(*s) for s in self.subnets]
+
+    def _read(self, tag, element):
+        if tag == "groupInfo":
+            self.groups = self.groups or []
+            self.groups.append(GroupInfo(element.findtext("groupName"),
+                                         element.findtext("groupType")))
+        elif tag == "subnets":
+            self.subnets = self.subnets or []
+            self.subnets.append(Subnet(element.findtext("ipAddress"),
+                                       element.findtext("netMask")))
+        elif tag == "tacacsConnection":
+            self.tacacs_secret = element.findtext("sharedSecret")
+        elif tag == "radiusConnection":
+            self.radius_secret = element.findtext("sharedSecret")
+
+    def _loaded(self):
+        if self.groups is None:
+            self.groups = []
+        if self.subnets is None:
+            self.subnets = []
+
+    def _write(self, parts):
+        self._write_groups(parts)
+        self._write_subnets(parts)
+        if self.tacacs_secret is not None:
+            self._write_tacacs(parts)
+        if self.radius_secret is not None:
+            self._write_radius(parts)
+
+    def _write_groups(self, parts):
+        for group in self.groups or ():
+            parts.append("<groupInfo>")
+            _text_element(parts, "groupName", group.name)
+            _text_element(parts, "groupType", group.type)
+            parts.append("</groupInfo>")
+
+    def _write_subnets(self, parts):
+        for subnet in self.subnets or ():
+            parts.append("<subnets>")
+            _text_element(parts, "ipAddress", subnet.ip)
+            _text_element(parts, "netMask", subnet.mask)
+            parts.append("</subnets>")
+
+    def _write_tacacs(self, parts):
+        parts.append("<tacacsConnection><legacyTACACS>true</legacyTACACS>")
+        _text_element(parts, "sharedSecret", self.tacacs_secret)
+        parts.append("<singleConnect>false</singleConnect></tacacsConnection>")
+
+    def _write_radius(self, parts):
+        parts.append("<radiusConnection><displayedInHex>true</displayedInHex>"
+                     "<keyWrap>false</keyWrap><portCoA>1700</portCoA>")
+        _text_element(parts, "sharedSecret", self.radius_secret)
+        parts.append("</radiusConnection>")
+
+    def _patch(self, element, changed):
+        if self.groups is not None and "groups" in changed:
+            _replace_children(element, "groupInfo", _fragment(self._write_groups),
+                              ("description", "id", "name"))
+        if self.subnets is not None and "subnets" in changed:
+            _replace_children(element, "subnets", _fragment(self._write_subnets),
+                              ("description", "id", "name", "groupInfo"))
+        for attr, tag, write in (("tacacs_secret", "tacacsConnection", self._write_tacacs),
+                                 ("radius_secret", "radiusConnection", self._write_radius)):
+            secret = getattr(self, attr)
+            if secret is None or attr not in changed:
+                continue
+            connection = _children(element, tag)
+            if not connection:
+                element.extend(_fragment(write))
+            elif _children(connection[0], "sharedSecret"):
+                _children(connection[0], "sharedSecret")[0].text = secret
+            else:
+                ET.SubElement(connection[0], "sharedSecret").text = secret
+
+
+class DeviceGroup(Model):
+    """ NetworkDevice/DeviceGroup """
+    __slots__ = ("id", "name", "description", "group_type")
+    object_type = "NetworkDevice/DeviceGroup"
+    _ns = NETWORK_DEVICE_NS
+    _tag = "deviceGroup"
+    _fields = (("description", "description", False),
+               ("id", "id", False),
+               ("name", "name", False),
+               ("group_type", "groupType", False))
+
+
+class IdentityGroup(Model):
+    """ Identity/IdentityGroup """
+    __slots__ = ("id", "name", "description")
+    object_type = "Identity/IdentityGroup"
+    _ns = IDENTITY_NS
+    _tag = "identityGroup"
+    _fields = (("description", "description", False),
+               ("id", "id", False),
+               ("name", "name", False))
+
+
+class User(Model):
+    """ Identity/User """
+    __slots__ = ("id", "name", "description", "identity_group", "enabled",
+                 "change_password", "password", "enable_password")
+    object_type = "Identity/User"
+    _ns = IDENTITY_NS
+    _tag = "user"
+    _fields = (("description", "description", False),
+               ("id", "id", False),
+               ("name", "name", False),
+               ("identity_group", "identityGroupName", False),
+               ("enabled", "enabled", True),
+               ("change_password", "changePassword", True),
+               ("password", "password", False),
+               ("enable_password", "enablePassword", False))
+
+
+class Host(Model):
+    """ Host """
+    __slots__ = ("id", "name", "description", "identity_group", "enabled")
+    object_type = "Host"
+    _ns = IDENTITY_NS
+    _tag = "host"
+    _fields = (("description", "description", False),
+               ("id", "id", False),
+               ("name", "name", False),
+               ("identity_group", "identityGroupName", False),
+               ("enabled", "enabled", True))
+
+
+MODELS = dict((cls.object_type, cls) for cls in
+              (Device, DeviceGroup, IdentityGroup, User, Host))
+_BY_TAG = dict((cls._tag, cls) for cls in MODELS.values())
+
+
+def from_element(element, keep_source=True):
+    """ Build the matching model for an object element
+
+    Useful with iter_read and iter_search, which yield raw elements.
+
+    :param element: Object element from an ACS response
+    :type element: xml.etree.ElementTree.Element
+    :param keep_source: See Model.from_xml (optional)
+    :type keep_source: boolean
+    :returns: Model instance
+    :raises KeyError: if the element is not a supported object type
+    """
+    return _BY_TAG[localname(element.tag)].from_xml(element, keep_source)
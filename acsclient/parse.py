@@ -0,0 +1,121 @@
+import xml.etree.ElementTree as ET
+
+
+def localname(tag):
+    """ Strip the XML namespace from an element tag
+
+    :param tag: Element tag, e.g. {networkdevice.rest.mgmt.acs.nm.cisco.com}device
+    :type tag: str or unicode
+    :returns: Tag without the namespace, e.g. device
+    :rtype: str
+    """
+    return tag.rsplit("}", 1)[-1]
+
+
+def iter_objects(content):
+    """ Yield every object element of an ACS list response
+
+    ACS wraps lists of objects (read all, op/query results) in a single root
+    element. Each direct child of that root is one object.
+
+    :param content: Response body
+    :type content: bytes or str
+    :returns: Generator of object elements
+    :rtype: generator
+    """
+    if not content:
+        return
+    root = ET.fromstring(content)
+    for element in root:
+        yield element
+
+
+def error_message(response):
+    """ Extract the error text from a failed ACS response
+
+    ACS reports failures as a Common/ErrorMessage document. The text of its
+    message element is returned when present, otherwise the HTTP reason.
+
+    :param response: Response returned by the ACS Server
+    :type response: requests.models.Response
+    :returns: Error description
+    :rtype: str
+    """
+    try:
+        root = ET.fromstring(response.content)
+    except ET.ParseError:
+        return response.reason
+    for element in root.iter():
+        if localname(element.tag) == "message" and element.text:
+            return element.text.strip()
+    return response.reason
+
+
+def iterparse_objects(source):
+    """ Incrementally yield every object element of an ACS list response
+
+    The body is parsed as it is read from source, so the first object is
+    available before the whole document has arrived. Each object is detached
+    from the document once yielded, which keeps peak memory at roughly one
+    object regardless of how many the response contains.
+
+    :param source: File-like object with the response body
+    :type source: file
+    :returns: Generator of object elements
+    :rtype: generator
+    """
+    root = None
+    depth = 0
+    for event, element in ET.iterparse(source, events=("start", "end")):
+        if event == "start":
+            if root is None:
+                root = element
+            depth += 1
+            continue
+        depth -= 1
+        if depth == 1:
+            yield element
+            root.remove(element)
+
+
+def object_identity(content):
+    """ Return the name and id of a single object document
+
+    :param content: XML document of one ACS object
+    :type content: bytes or str
+    :returns: (name, id), either of which may be None
+    :rtype: tuple
+    """
+    try:
+        root = ET.fromstring(content)
+    except ET.ParseError:
+        return None, None
+    name = id_ = None
+    for element in root:
+        tag = localname(element.tag)
+        if tag == "name":
+            name = element.text
+        elif tag == "id":
+            id_ = element.text
+    return name, id_
+
+
+def service_locations(content):
+    """ Extract the ACS instances from a Common/ServiceLocation document
+
+    Every element with an address (or name) child is taken as an instance;
+    a true isPrimary/primary child marks the primary.
+
+    :param content: Response body
+    :type content: bytes or str
+    :returns: List of (address, is_primary)
+    :rtype: list
+    """
+    locations = []
+    for element in ET.fromstring(content).iter():
+        fields = dict((localname(child.tag), (child.text or "").strip()) for child in element)
+        address = fields.get("address") or fields.get("ipAddress") or fields.get("name")
+        if address and len(element):
+            primary = (fields.get("isPrimary") or fields.get("primary") or "").lower()
+            locations.append((address, primary == "true"))
+    return locations
@@ -0,0 +1,75 @@
+class Query(object):
+    """ Server side search filter for op/query requests
+
+    Conditions added with where() are sent in a single request and combined
+    by ACS, either all of them (AndFilter) or any of them (OrFilter).
+
+    Example::
+
+        query = Query().where("name", "STARTS_WITH", "RTR") \\
+                       .where("description", "CONTAINS", "core")
+        for device in acs.iter_query("NetworkDevice/Device", query):
+            ...
+    """
+
+    conditions = ['CONTAINS', 'DOES_NOT_CONTAIN', 'ENDS_WITH', 'EQUALS',
+                  'NOT_EMPTY', 'NOT_EQUALS', 'STARTS_WITH']
+
+    _criteria = {'all': 'AndFilter', 'any': 'OrFilter'}
+
+    def __init__(self, match="all"):
+        """ Class initialization method
+
+        :param match: "all" to require every condition, "any" to require at
+            least one (optional)
+        :type match: str
+        """
+        if match not in self._criteria:
+            raise ValueError("match must be 'all' or 'any', not %r" % match)
+        self.match = match
+        self.filters = []
+
+    @classmethod
+    def everything(cls):
+        """ Return a query matching every object of a type
+
+        :rtype: Query
+        """
+        return cls().where("name", "NOT_EMPTY")
+
+    def where(self, key, condition, value=""):
+        """ Add a condition
+
+        :param key: Property to filter on, e.g. name or ipAddress
+        :type key: str or unicode
+        :param condition: One of Query.conditions
+        :type condition: str
+        :param value: Value to compare with (optional for NOT_EMPTY)
+        :type value: str or unicode
+        :returns: self, so calls can be chained
+        :rtype: Query
+        """
+        condition = condition.upper()
+        if condition not in self.conditions:
+            raise ValueError("Unsupported condition %r" % condition)
+        self.filters.append(dict(key=key, filter=condition, value=value))
+        return self
+
+    def to_config(self, page_size=100, page=1):
+        """ Return the search.j2 config for one page of this query
+
+        :param page_size: Number of results per page
+        :type page_size: int
+        :param page: Page number, starting at 1
+        :type page: int
+        :rtype: dict
+        """
+        if not self.filters:
+            raise ValueError("Query has no conditions")
+        return dict(criteria=self._criteria[self.match], filters=self.filters,
+                    page_size=page_size, page=page)
+
+    def __repr__(self):
+        join = " AND " if self.match == "all" else " OR "
+        return "<Query %s>" % join.join(
+            "%(key)s %(filter)s %(value)r" % f for f in self.filters)
@@ -0,0 +1,200 @@
+import copy
+from collections import namedtuple
+
+from .bulk import run_bounded
+from .models import Device, DeviceGroup
+
+
+class Action(namedtuple("Action", "op object_type name obj changes")):
+    """ One write needed to reach the desired state
+
+    :ivar op: create, update or delete
+    :ivar object_type: Cisco ACS Object Type
+    :ivar name: Object name
+    :ivar obj: Model to send (None for delete)
+    :ivar changes: {field: (current, desired)} for updates
+    """
+    __slots__ = ()
+
+    def __str__(self):
+        line = "%s %s %s" % (self.op, self.object_type, self.name)
+        if self.changes:
+            line += " (%s)" % ", ".join(sorted(self.changes))
+        return line
+
+
+class Plan(object):
+    """ Ordered set of writes produced by plan()
+
+    Writes are grouped into stages that must run one after another. Writes
+    inside a stage are independent and may run in parallel. Device groups
+    are created parent before child, devices are written once every group
+    exists, and groups are deleted child before parent.
+
+    :ivar stages: List of lists of Action
+    :ivar results: BulkResult list filled in by apply()
+    """
+
+    def __init__(self, stages):
+        self.stages = [stage for stage in stages if stage]
+        self.results = []
+
+    def __iter__(self):
+        for stage in self.stages:
+            for action in stage:
+                yield action
+
+    def __len__(self):
+        return sum(len(stage) for stage in self.stages)
+
+    def __str__(self):
+        if not self.stages:
+            return "Nothing to do"
+        return "\n".join(str(action) for action in self)
+
+
+def _as_model(cls, obj):
+    return obj if isinstance(obj, cls) else cls(**obj)
+
+
+def _depth(name):
+    return name.count(":")
+
+
+def _by_depth(actions, reverse=False):
+    stages = {}
+    for action in actions:
+        stages.setdefault(_depth(action.name), []).append(action)
+    return [stages[depth] for depth in sorted(stages, reverse=reverse)]
+
+
+def _normalize(field, value):
+    if field == "groups":
+        return sorted(set((g.name, g.type) for g in value))
+    if field == "subnets":
+        return sorted(set((s.ip, str(s.mask)) for s in value))
+    return value
+
+
+def diff(current, desired):
+    """ Return the fields of desired that differ from current
+
+    Attributes left as None on desired are treated as "don't care", as are
+    ids. Group and subnet lists are compared regardless of order.
+
+    :param current: Object as it exists on the server
+    :type current: acsclient.models.Model
+    :param desired: Object as it should be
+    :type desired: acsclient.models.Model
+    :returns: {field: (current, desired)}
+    :rtype: dict
+    """
+    changes = {}
+    for field in desired.__slots__:
+        if field == "id":
+            continue
+        want = getattr(desired, field)
+        if want is None or (field == "description" and want == "" and
+                            getattr(current, field) is None):
+            continue
+        have = _normalize(field, getattr(current, field))
+        if have != _normalize(field, want):
+            changes[field] = (getattr(current, field), want)
+    return changes
+
+
+def _merge(current, changes):
+    # current keeps the element it was read from, so the PUT carries every
+    # setting ACS returned and only the changed fields differ
+    merged = copy.copy(current)
+    for field, (_, want) in changes.items():
+        setattr(merged, field, want)
+    return merged
+
+
+def _plan_type(cls, current, desired, delete):
+    creates, updates = [], []
+    for name, want in desired.items():
+        have = current.get(name)
+        if have is None:
+            creates.append(Action("create", cls.object_type, name, want, None))
+            continue
+        changes = diff(have, want)
+        if changes:
+            updates.append(Action("update", cls.object_type, name,
+                                  _merge(have, changes), changes))
+    deletes = []
+    if delete:
+        deletes = [Action("delete", cls.object_type, name, None, None)
+                   for name in current if name not in desired]
+    return creates, updates, deletes
+
+
+def plan(client, desired_devices, desired_groups=(), delete=False):
+    """ Compare the desired state with the server and list the needed writes
+
+    The current devices and device groups are fetched once, each with a
+    single streamed read.
+
+    :param client: Client used to read the current state
+    :type client: acsclient.acsclient.ACSClient
+    :param desired_devices: Devices as models or Device keyword dicts
+    :type desired_devices: iterable
+    :param desired_groups: Device groups as models or DeviceGroup keyword dicts
+    :type desired_groups: iterable
+    :param delete: Also delete devices (and, if desired_groups is given,
+        groups) that are not in the desired state
+    :type delete: boolean
+    :rtype: Plan
+    """
+    devices = dict((d.name, d) for d in
+                   (_as_model(Device, d) for d in desired_devices))
+    groups = dict((g.name, g) for g in
+                  (_as_model(DeviceGroup, g) for g in desired_groups))
+
+    current_devices = dict((d.name, d) for d in
+                           (Device.from_xml(e) for e in client.iter_read(Device.object_type)))
+    current_groups = {}
+    if groups:
+        current_groups = dict((g.name, g) for g in
+                              (DeviceGroup.from_xml(e) for e in
+                               client.iter_read(DeviceGroup.object_type)))
+
+    group_creates, group_updates, group_deletes = _plan_type(
+        DeviceGroup, current_groups, groups, delete and bool(groups))
+    # Top level groups (All Locations, All Device Types) are built in
+    group_deletes = [a for a in group_deletes if _depth(a.name)]
+    device_creates, device_updates, device_deletes = _plan_type(
+        Device, current_devices, devices, delete)
+
+    stages = _by_depth(group_creates)
+    stages.append(group_updates)
+    stages.append(device_deletes + device_creates + device_updates)
+    stages.extend(_by_depth(group_deletes, reverse=True))
+    return Plan(stages)
+
+
+def apply(client, plan, workers=8, progress=None):
+    """ Execute a Plan, one stage at a time with each stage in parallel
+
+    :param client: Client used for the writes
+    :type client: acsclient.acsclient.ACSClient
+    :param plan: Plan returned by plan()
+    :type plan: Plan
+    :param workers: Number of parallel requests (optional)
+    :type workers: int
+    :param progress: Called with a BulkProgress after each write (optional)
+    :type progress: callable
+    :returns: plan, with plan.results filled in
+    :rtype: Plan
+    """
+    def write(action):
+        if action.op == "create":
+            return client.create(action.object_type, action.obj)
+        if action.op == "update":
+            return client.update(action.object_type, action.obj)
+        return client.delete(action.object_type, "name", action.name)
+
+    for stage in plan.stages:
+        plan.results.extend(run_bounded(write, stage, workers, progress=progress))
+    return plan
@@ -0,0 +1,76 @@
+import os
+import threading
+
+TEMPLATE_DIR = os.path.join(os.path.dirname(__file__), "templates")
+
+_env = None
+_templates = {}
+_lock = threading.Lock()
+
+
+def environment():
+    """ Return the process wide Jinja Environment
+
+    The environment is created on first use and shared afterwards. Templates
+    never change on disk at runtime, so auto reloading is disabled to skip the
+    per lookup stat() calls.
+
+    :returns: Shared Jinja Environment
+    :rtype: jinja2.Environment
+    """
+    global _env
+    if _env is None:
+        with _lock:
+            if _env is None:
+                from jinja2 import Environment, FileSystemLoader
+                _env = Environment(loader=FileSystemLoader(TEMPLATE_DIR),
+                                   auto_reload=False)
+    return _env
+
+
+def get_template(name):
+    """ Return the compiled template for name, compiling it only once
+
+    :param name: Template file name (e.g. device.j2)
+    :type name: str or unicode
+    :returns: Compiled template
+    :rtype: jinja2.Template
+    """
+    try:
+        return _templates[name]
+    except KeyError:
+        template = environment().get_template(name)
+        _templates[name] = template
+        return template
+
+
+def render(name, config):
+    """ Render a single payload
+
+    :param name: Template file name (e.g. device.j2)
+    :type name: str or unicode
+    :param config: Values passed to the template as ``config``
+    :type config: dict
+    :returns: XML payload
+    :rtype: str
+    """
+    return get_template(name).render(config=config)
+
+
+def render_many(name, configs):
+    """ Render a payload for every config in an iterable
+
+    The template is resolved once up front, so each item only pays for the
+    render itself. Payloads are yielded lazily, which keeps memory flat for
+    arbitrarily large inputs.
+
+    :param name: Template file name (e.g. device.j2)
+    :type name: str or unicode
+    :param configs: Iterable of dicts passed to the template as ``config``
+    :type configs: iterable
+    :returns: Generator of XML payloads
+    :rtype: generator
+    """
+    template_render = get_template(name).render
+    for config in configs:
+        yield template_render(config=config)
@@ -0,0 +1,56 @@
+import threading
+
+
+class _Call(object):
+    __slots__ = ("event", "result", "error")
+
+    def __init__(self):
+        self.event = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class SingleFlight(object):
+    """ Share one in-flight call among concurrent callers with the same key
+
+    The first caller for a key runs the function; callers arriving while it
+    runs wait and receive the same result (or exception). Nothing is kept
+    once the call finishes, so results are never stale.
+
+    :ivar shared: Number of calls answered by another caller's request
+    """
+
+    def __init__(self):
+        self.shared = 0
+        self._calls = {}
+        self._lock = threading.Lock()
+
+    def do(self, key, func):
+        """ Run func, or wait for the identical call already in flight
+
+        :param key: Hashable identity of the call
+        :param func: Callable without arguments
+        :returns: Result of func
+        """
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = _Call()
+            else:
+                self.shared += 1
+        if not leader:
+            call.event.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+        try:
+            call.result = func()
+            return call.result
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.event.set()
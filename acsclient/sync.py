@@ -0,0 +1,105 @@
+"""
+Change detection for incremental mirrors of ACS objects
+
+Every object gets a content fingerprint: a hash of its XML with namespaces,
+whitespace and child order normalized away. A sync walks the paged search
+results once, compares each fingerprint with the previous snapshot and
+reports only what was added, changed or removed.
+
+Example::
+
+    delta = sync(acs, "NetworkDevice/Device")           # first run: all added
+    save_snapshot(delta.snapshot, "devices.json")
+    ...
+    delta = sync(acs, "NetworkDevice/Device", load_snapshot("devices.json"))
+    for element in delta.added + delta.changed:
+        update_cmdb(from_element(element))
+"""
+import hashlib
+import json
+from collections import namedtuple
+
+from .parse import localname
+from .query import Query
+
+
+class Delta(namedtuple("Delta", "added changed removed snapshot")):
+    """ Result of sync()
+
+    :ivar added: Elements of objects missing from the previous snapshot
+    :ivar changed: Elements of objects whose fingerprint changed
+    :ivar removed: Names of objects no longer on the server
+    :ivar snapshot: {name: fingerprint} for the current state, to pass as
+        previous to the next sync
+    """
+    __slots__ = ()
+
+    def __bool__(self):
+        return bool(self.added or self.changed or self.removed)
+
+
+def _canonical(element):
+    text = (element.text or "").strip()
+    children = sorted(_canonical(child) for child in element)
+    attributes = sorted((localname(k), v) for k, v in element.attrib.items())
+    return "<%s%s>%s%s</>" % (localname(element.tag),
+                              "".join(' %s="%s"' % a for a in attributes),
+                              json.dumps(text), "".join(children))
+
+
+def fingerprint(element):
+    """ Return a stable content hash of an object element
+
+    Namespace prefixes, insignificant whitespace and the order of child
+    elements do not affect the result.
+
+    :param element: Object element from an ACS response
+    :type element: xml.etree.ElementTree.Element
+    :rtype: str
+    """
+    return hashlib.sha1(_canonical(element).encode("utf-8")).hexdigest()
+
+
+def sync(client, object_type, previous=None, page_size=500, prefetch=True):
+    """ Fetch all objects of a type and report changes since a snapshot
+
+    :param client: Client used to fetch the objects
+    :type client: acsclient.acsclient.ACSClient
+    :param object_type: Cisco ACS Object Type
+    :type object_type: str or unicode
+    :param previous: Snapshot from the last sync; everything is reported as
+        added when None (optional)
+    :type previous: dict
+    :param page_size: Objects per request (optional)
+    :type page_size: int
+    :param prefetch: Fetch the next page while comparing the current one
+        (optional)
+    :type prefetch: boolean
+    :rtype: Delta
+    """
+    previous = previous or {}
+    snapshot = {}
+    added, changed = [], []
+    for element in client.iter_query(object_type, Query.everything(), page_size, prefetch):
+        name = element.findtext("name")
+        digest = fingerprint(element)
+        snapshot[name] = digest
+        old = previous.get(name)
+        if old is None:
+            added.append(element)
+        elif old != digest:
+            changed.append(element)
+    removed = [name for name in previous if name not in snapshot]
+    return Delta(added, changed, removed, snapshot)
+
+
+def save_snapshot(snapshot, path):
+    """ Write a snapshot to a JSON file """
+    with open(path, "w") as f:
+        json.dump(snapshot, f, sort_keys=True)
+
+
+def load_snapshot(path):
+    """ Read a snapshot written by save_snapshot """
+    with open(path) as f:
+        return json.load(f)
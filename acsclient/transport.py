@@ -0,0 +1,63 @@
+"""
+requests transport adapter that times connection setup
+
+urllib3 opens connections lazily inside the request, so the time spent on
+TCP connect and the TLS handshake is normally folded into the response wait.
+TimedHTTPAdapter makes its pools use connection classes that record how long
+connect() takes, per thread, so ACSClient can report it separately.
+"""
+import threading
+import time
+
+from requests.adapters import HTTPAdapter
+from urllib3.connection import HTTPConnection, HTTPSConnection
+from urllib3.connectionpool import HTTPConnectionPool, HTTPSConnectionPool
+
+_local = threading.local()
+
+
+def connect_time():
+    """ Seconds this thread spent opening connections since the last call
+
+    :rtype: float
+    """
+    elapsed = getattr(_local, "connect", 0.0)
+    _local.connect = 0.0
+    return elapsed
+
+
+class _TimedConnect(object):
+
+    def connect(self):
+        start = time.time()
+        try:
+            return super(_TimedConnect, self).connect()
+        finally:
+            _local.connect = getattr(_local, "connect", 0.0) + time.time() - start
+
+
+class _TimedHTTPConnection(_TimedConnect, HTTPConnection):
+    pass
+
+
+class _TimedHTTPSConnection(_TimedConnect, HTTPSConnection):
+    pass
+
+
+class _TimedHTTPConnectionPool(HTTPConnectionPool):
+    ConnectionCls = _TimedHTTPConnection
+
+
+class _TimedHTTPSConnectionPool(HTTPSConnectionPool):
+    ConnectionCls = _TimedHTTPSConnection
+
+
+class TimedHTTPAdapter(HTTPAdapter):
+    """ HTTPAdapter whose new connections add their setup time to connect_time """
+
+    def init_poolmanager(self, *args, **kwargs):
+        super(TimedHTTPAdapter, self).init_poolmanager(*args, **kwargs)
+        self.poolmanager.pool_classes_by_scheme = {
+            "http": _TimedHTTPConnectionPool,
+            "https": _TimedHTTPSConnectionPool,
+        }
@@ -0,0 +1,157 @@
+import logging
+import threading
+from collections import OrderedDict
+from concurrent.futures import Future
+
+from .bulk import run_bounded
+from .parse import object_identity
+
+log = logging.getLogger(__name__)
+
+
+class WriteBehindQueue(object):
+    """ Buffer create/update calls and write them in parallel batches
+
+    create() and update() return a Future immediately. Writes are keyed by
+    object type and name; while a write is pending, a newer one for the same
+    object replaces it, so only the last state is sent. A create followed by
+    updates stays a create carrying the latest payload. Every Future of a
+    replaced write resolves with the result of the write that was sent.
+
+    A background thread flushes the pending writes every ``interval``
+    seconds, ``workers`` at a time. Futures resolve to a BulkResult whose
+    record is the data that was written; failed writes are then passed to
+    ``on_error``. Exceptions raised by ``on_error`` are logged and do not
+    stop the queue.
+
+    Example::
+
+        with acs.write_behind(interval=2) as queue:
+            for event in cmdb_events():
+                queue.update("NetworkDevice/Device", event.device)
+
+    :ivar enqueued: Writes accepted
+    :ivar coalesced: Writes replaced by a newer one before being sent
+    :ivar written: Writes sent
+    :ivar failed: Writes that failed
+    """
+
+    def __init__(self, client, interval=1.0, workers=8, on_error=None):
+        """ Class initialization method
+
+        :param client: Client used for the writes
+        :type client: acsclient.acsclient.ACSClient
+        :param interval: Seconds between flushes (optional)
+        :type interval: float
+        :param workers: Number of parallel requests per flush (optional)
+        :type workers: int
+        :param on_error: Called with the BulkResult of every failed write
+            (optional)
+        :type on_error: callable
+        """
+        self.client = client
+        self.interval = interval
+        self.workers = workers
+        self.on_error = on_error
+        self.enqueued = self.coalesced = self.written = self.failed = 0
+        self._pending = OrderedDict()
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run)
+        self._thread.daemon = True
+        self._thread.start()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def __len__(self):
+        return len(self._pending)
+
+    def create(self, object_type, data):
+        """ Queue a create
+
+        :param object_type: Cisco ACS Object Type
+        :type object_type: str or unicode
+        :param data: XML data or model object
+        :type data: str, unicode or acsclient.models.Model
+        :rtype: concurrent.futures.Future
+        """
+        return self._enqueue("create", object_type, data)
+
+    def update(self, object_type, data):
+        """ Queue an update
+
+        :param object_type: Cisco ACS Object Type
+        :type object_type: str or unicode
+        :param data: XML data or model object
+        :type data: str, unicode or acsclient.models.Model
+        :rtype: concurrent.futures.Future
+        """
+        return self._enqueue("update", object_type, data)
+
+    def _enqueue(self, op, object_type, data):
+        if self._stop.is_set():
+            raise RuntimeError("Write-behind queue is closed")
+        name = getattr(data, "name", None)
+        if name is None:
+            name = object_identity(data)[0]
+        if name is None:
+            raise ValueError("Cannot queue a write for an object without a name")
+        future = Future()
+        key = (object_type, name)
+        with self._lock:
+            self.enqueued += 1
+            pending = self._pending.pop(key, None)
+            futures = [future]
+            if pending is not None:
+                self.coalesced += 1
+                futures = pending[2] + futures
+                if pending[0] == "create":
+                    op = "create"
+            self._pending[key] = (op, data, futures)
+        return future
+
+    def flush(self):
+        """ Send every pending write now and wait for the results """
+        with self._flush_lock:
+            with self._lock:
+                batch, self._pending = self._pending, OrderedDict()
+            if not batch:
+                return
+
+            def write(item):
+                (object_type, _), (op, data, _) = item
+                if op == "create":
+                    return self.client.create(object_type, data)
+                return self.client.update(object_type, data)
+
+            for result in run_bounded(write, batch.items(), self.workers):
+                _, (_, data, futures) = result.record
+                result = result._replace(record=data)
+                self.written += 1
+                for future in futures:
+                    future.set_result(result)
+                if not result.ok:
+                    self.failed += 1
+                    if self.on_error is not None:
+                        try:
+                            self.on_error(result)
+                        except Exception:
+                            log.exception("Write-behind on_error callback failed")
+
+    def close(self):
+        """ Stop the background thread after a final flush """
+        self._stop.set()
+        self._thread.join()
+        self.flush()
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            try:
+                self.flush()
+            except Exception:
+                log.exception("Write-behind flush failed")
@@ -0,0 +1,55 @@
+"""
+Import-time benchmark
+
+Measures the wall time of ``import acsclient.acsclient`` and of creating a
+client in fresh interpreters, and lists the slowest modules reported by
+``python -X importtime``.
+
+Usage::
+
+    python benchmarks/bench_import.py [runs]
+"""
+import os
+import subprocess
+import sys
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+
+SNIPPETS = (
+    ("import acsclient", "import acsclient"),
+    ("import acsclient.acsclient", "from acsclient.acsclient import ACSClient"),
+    ("construct ACSClient", "from acsclient.acsclient import ACSClient; "
+                            "ACSClient('localhost', 'u', 'p')"),
+)
+
+TIMER = ("import time; t = time.perf_counter(); %s; "
+         "print((time.perf_counter() - t) * 1000)")
+
+
+def run(snippet, runs):
+    times = []
+    for _ in range(runs):
+        out = subprocess.check_output([sys.executable, "-c", TIMER % snippet], cwd=ROOT)
+        times.append(float(out))
+    return sorted(times)[len(times) // 2]
+
+
+def main():
+    runs = int(sys.argv[1]) if len(sys.argv) > 1 else 10
+    for label, snippet in SNIPPETS:
+        print("%-28s %8.1f ms (median of %d)" % (label, run(snippet, runs), runs))
+    err = subprocess.check_output([sys.executable, "-X", "importtime", "-c",
+                                   "import acsclient.acsclient"],
+                                  cwd=ROOT, stderr=subprocess.STDOUT, universal_newlines=True)
+    rows = []
+    for line in err.splitlines()[1:]:
+        parts = line.split("|")
+        if len(parts) == 3:
+            rows.append((int(parts[1]), parts[2].rstrip()))
+    print("\nSlowest cumulative imports for acsclient.acsclient (us):")
+    for cumulative, name in sorted(rows, reverse=True)[:10]:
+        print("%10d %s" % (cumulative, name))
+
+
+if __name__ == "__main__":
+    main()
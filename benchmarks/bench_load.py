@@ -0,0 +1,103 @@
+"""
+Load benchmarks against the bundled mock ACS server
+
+The mock server runs in a separate process (python -m acsclient.mockserver),
+so client CPU and memory are measured on their own. For each inventory size
+the suite reports requests/s, objects/s, p50/p99 request latency and the
+client's peak traced memory for the scenarios below. Memory is traced in a
+second run of each scenario, since tracemalloc slows the client down.
+
+    read-all     iter_read("NetworkDevice/Device")
+    paged-search iter_search(... STARTS_WITH "DEV", page_size=100, prefetch)
+    bulk-create  bulk_create_devices(..., workers=16)
+
+Usage::
+
+    python benchmarks/bench_load.py --sizes 1000,10000,100000 --latency 0.002
+"""
+import argparse
+import os
+import subprocess
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from acsclient.acsclient import ACSClient  # noqa: E402
+
+
+def percentile(values, fraction):
+    if not values:
+        return 0.0
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * fraction))]
+
+
+def start_server(devices, latency, error_rate):
+    proc = subprocess.Popen(
+        [sys.executable, "-m", "acsclient.mockserver", "--devices", str(devices),
+         "--latency", str(latency), "--error-rate", str(error_rate)],
+        stdout=subprocess.PIPE, universal_newlines=True,
+        cwd=os.path.join(os.path.dirname(__file__), ".."))
+    line = proc.stdout.readline()
+    return proc, line.rsplit(" ", 1)[-1].strip()
+
+
+def measure(name, size, client, func):
+    latencies = []
+    client.hooks[:] = [lambda event: latencies.append(event.total)]
+    start = time.time()
+    objects = func("a")
+    elapsed = time.time() - start
+    client.hooks[:] = []
+    tracemalloc.start()
+    func("b")
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    print("%-13s %7d %9.0f %10.0f %9.1f %9.1f %9.1f" % (
+        name, size, len(latencies) / elapsed, objects / elapsed,
+        percentile(latencies, 0.5) * 1000, percentile(latencies, 0.99) * 1000,
+        peak / 1048576.0))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--sizes", default="1000,10000")
+    parser.add_argument("--latency", type=float, default=0.0)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--workers", type=int, default=16)
+    args = parser.parse_args()
+
+    print("%-13s %7s %9s %10s %9s %9s %9s" % (
+        "scenario", "objects", "req/s", "objects/s", "p50 ms", "p99 ms", "peak MiB"))
+    for size in [int(s) for s in args.sizes.split(",")]:
+        proc, hostname = start_server(size, args.latency, args.error_rate)
+        try:
+            client = ACSClient(hostname, "admin", "admin", scheme="http",
+                               pool_maxsize=args.workers)
+
+            def read_all(run):
+                return sum(1 for _ in client.iter_read("NetworkDevice/Device"))
+
+            def paged_search(run):
+                return sum(1 for _ in client.iter_search(
+                    "NetworkDevice/Device", "name", "DEV", "STARTS_WITH",
+                    page_size=100, prefetch=True))
+
+            def bulk_create(run):
+                records = (dict(name="NEW%s%06d" % (run, i), secret="s3cr37", ip="192.0.2.1",
+                                location="Bench", device_type="Router")
+                           for i in range(size))
+                return sum(1 for _ in client.bulk_create_devices(records, args.workers))
+
+            for name, func in (("read-all", read_all), ("paged-search", paged_search),
+                               ("bulk-create", bulk_create)):
+                measure(name, size, client, func)
+        finally:
+            proc.terminate()
+            proc.wait()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,63 @@
+"""
+Micro-benchmark for payload rendering
+
+Compares the original approach (a new Jinja Environment and template compile
+for every payload) against the shared engine in acsclient.render.
+
+Usage::
+
+    python benchmarks/bench_render.py [count]
+"""
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from jinja2 import Environment, FileSystemLoader  # noqa: E402
+
+from acsclient import render  # noqa: E402
+
+GROUPS = [
+    {"name": "All Locations:Site", "type": "Location"},
+    {"name": "All Device Types:Router", "type": "Device Type"},
+]
+
+
+def configs(count):
+    for i in range(count):
+        yield dict(name="ROUTER%05d" % i, ip="10.%d.%d.1" % (i // 256 % 256, i % 256),
+                   mask=32, secret="s3cr37", groups=GROUPS, description="")
+
+
+def per_call(count):
+    for config in configs(count):
+        env = Environment(loader=FileSystemLoader(render.TEMPLATE_DIR))
+        env.get_template("device.j2").render(config=config)
+
+
+def shared(count):
+    for config in configs(count):
+        render.render("device.j2", config)
+
+
+def bulk(count):
+    for _ in render.render_many("device.j2", configs(count)):
+        pass
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+    baseline = None
+    for label, func in (("per-call Environment", per_call),
+                        ("shared render()", shared),
+                        ("render_many()", bulk)):
+        start = time.perf_counter()
+        func(count)
+        rate = count / (time.perf_counter() - start)
+        baseline = baseline or rate
+        print("%-22s %10.0f payloads/s  (x%.1f)" % (label, rate, rate / baseline))
+
+
+if __name__ == "__main__":
+    main()
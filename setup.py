@@ -31,6 +31,9 @@ setup(
         'jinja2',
         'MarkupSafe'
     ],
+    python_requires='>=3.7',
     setup_requires=[],
-    namespace_packages=['acsclient'],
+    entry_points={
+        'console_scripts': ['acsclient=acsclient.cli:main'],
+    },
 )
@@ -0,0 +1,13 @@
+""" Shared test data """
+
+DEVICE = ('<ns1:device xmlns:ns1="networkdevice.rest.mgmt.acs.nm.cisco.com">'
+          '<description>core</description><name>LON-1</name>'
+          '<groupInfo><groupName>All Locations:LON</groupName><groupType>Location</groupType></groupInfo>'
+          '<subnets><ipAddress>10.0.0.1</ipAddress><netMask>32</netMask></subnets>'
+          '<radiusConnection><displayedInHex>false</displayedInHex>'
+          '<keyEncryptionKey>abc</keyEncryptionKey><keyWrap>true</keyWrap>'
+          '<portCoA>3799</portCoA><sharedSecret>r</sharedSecret></radiusConnection>'
+          '<tacacsConnection><legacyTACACS>false</legacyTACACS><sharedSecret>t</sharedSecret>'
+          '<singleConnect>true</singleConnect></tacacsConnection>'
+          '<authenticationSettings><radius>1</radius></authenticationSettings>'
+          '</ns1:device>')
@@ -0,0 +1,27 @@
+import unittest
+
+from acsclient.cache import ReadCache
+
+
+class ReadCacheTest(unittest.TestCase):
+
+    def test_put_after_invalidation_is_refused(self):
+        cache = ReadCache()
+        key = ("NetworkDevice/Device", "name", "A")
+        generation = cache.generation("NetworkDevice/Device")
+        cache.invalidate("NetworkDevice/Device", ["A"])
+        self.assertFalse(cache.put(key, "stale", ["A"], generation))
+        self.assertIsNone(cache.get(key))
+        generation = cache.generation("NetworkDevice/Device")
+        self.assertTrue(cache.put(key, "fresh", ["A"], generation))
+        self.assertEqual(cache.get(key), "fresh")
+
+    def test_other_object_types_are_not_affected(self):
+        cache = ReadCache()
+        generation = cache.generation("Identity/User")
+        cache.invalidate("NetworkDevice/Device", ["A"])
+        self.assertTrue(cache.put(("Identity/User", "name", "u"), "user", ["u"], generation))
+
+
+if __name__ == "__main__":
+    unittest.main()
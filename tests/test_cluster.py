@@ -0,0 +1,30 @@
+import unittest
+
+from acsclient.cluster import ACSCluster
+from acsclient.mockserver import MockACSServer
+
+
+class ClusterTest(unittest.TestCase):
+
+    def setUp(self):
+        self.servers = [MockACSServer().start() for _ in range(2)]
+        self.cluster = ACSCluster([s.hostname for s in self.servers], "admin", "admin",
+                                  health_interval=0, scheme="http", cache_ttl=60,
+                                  coalesce=True, max_retries=0)
+
+    def tearDown(self):
+        self.cluster.close()
+        for server in self.servers:
+            server.stop()
+
+    def test_health_check_is_not_answered_from_the_cache(self):
+        primary, secondary = [s.hostname for s in self.servers]
+        self.assertEqual(self.cluster.check_health(), set([primary, secondary]))
+        self.servers[1].error_rate = 1.0
+        self.assertEqual(self.cluster.check_health(), set([primary]))
+        self.servers[1].error_rate = 0.0
+        self.assertEqual(self.cluster.check_health(), set([primary, secondary]))
+
+
+if __name__ == "__main__":
+    unittest.main()
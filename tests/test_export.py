@@ -0,0 +1,90 @@
+import json
+import os
+import shutil
+import tempfile
+import unittest
+
+from acsclient.export import export, from_record
+from acsclient.mockserver import MockACSServer
+from acsclient.models import Device
+
+from fixtures import DEVICE
+
+
+class ExportTest(unittest.TestCase):
+
+    def setUp(self):
+        self.server = MockACSServer().start()
+        self.server.add("NetworkDevice/Device", DEVICE)
+        self.acs = self.server.client()
+        self.tmp = tempfile.mkdtemp()
+        self.path = os.path.join(self.tmp, "inventory.jsonl")
+
+    def tearDown(self):
+        self.server.stop()
+        shutil.rmtree(self.tmp)
+
+    def test_record_keeps_the_full_element(self):
+        export(self.acs, self.path, ["NetworkDevice/Device"])
+        with open(self.path) as f:
+            record = json.loads(f.readline())
+        self.assertEqual(record["name"], "LON-1")
+        for text in ("<portCoA>3799</portCoA>", "<keyEncryptionKey>abc</keyEncryptionKey>",
+                     "<authenticationSettings>"):
+            self.assertIn(text, record["xml"])
+
+    def test_import_round_trip(self):
+        export(self.acs, self.path, ["NetworkDevice/Device"])
+        with open(self.path) as f:
+            record = json.loads(f.readline())
+        record["description"] = "edge"
+        self.acs.delete("NetworkDevice/Device", "name", "LON-1")
+        obj = from_record(record, create=True)
+        self.assertEqual(self.acs.create(obj.object_type, obj).status_code, 201)
+        content = self.acs.read("NetworkDevice/Device", "name", "LON-1").content
+        self.assertIn(b"<description>edge</description>", content)
+        self.assertIn(b"<singleConnect>true</singleConnect>", content)
+        self.assertIn(b"<authenticationSettings>", content)
+
+
+class ResumeTest(unittest.TestCase):
+
+    def setUp(self):
+        self.server = MockACSServer().start()
+        for i in range(10):
+            self.server.add("NetworkDevice/Device", Device(name="D%d" % i, tacacs_secret="s"))
+        self.acs = self.server.client()
+        self.tmp = tempfile.mkdtemp()
+
+    def tearDown(self):
+        self.server.stop()
+        shutil.rmtree(self.tmp)
+
+    def interrupted(self, path):
+        def stop(object_type, page, count):
+            raise KeyboardInterrupt
+        with self.assertRaises(KeyboardInterrupt):
+            export(self.acs, path, ["NetworkDevice/Device"], page_size=4, progress=stop)
+
+    def check_resume(self, path):
+        self.interrupted(path)
+        with self.assertRaises(ValueError):
+            export(self.acs, path, ["NetworkDevice/Device"], page_size=5)
+        with self.assertRaises(ValueError):
+            export(self.acs, path, ["NetworkDevice/Device", "Host"], page_size=4)
+        counts = export(self.acs, path, ["NetworkDevice/Device"], page_size=4)
+        self.assertEqual(counts, {"NetworkDevice/Device": 6})
+
+    def test_jsonl_refuses_other_settings(self):
+        path = os.path.join(self.tmp, "inventory.jsonl")
+        self.check_resume(path)
+        with open(path) as f:
+            names = [json.loads(line)["name"] for line in f]
+        self.assertEqual(sorted(names), ["D%d" % i for i in range(10)])
+
+    def test_sqlite_refuses_other_settings(self):
+        self.check_resume(os.path.join(self.tmp, "inventory.db"))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,55 @@
+import unittest
+
+from acsclient.mockserver import MockACSServer
+from acsclient.models import DeviceGroup
+
+
+class DeviceGroupTest(unittest.TestCase):
+
+    def setUp(self):
+        self.server = MockACSServer().start()
+        for name, group_type in (("All Locations", "Location"),
+                                 ("All Device Types", "Device Type")):
+            self.server.add("NetworkDevice/DeviceGroup",
+                            DeviceGroup(name=name, group_type=group_type))
+        self.acs = self.server.client()
+
+    def tearDown(self):
+        self.server.stop()
+
+    def test_unknown_group_is_rejected_before_any_request(self):
+        self.acs.load_device_groups()
+        requests = self.server.requests
+        with self.assertRaises(ValueError):
+            self.acs.create_device_simple("LON-1", "s", "10.0.0.1", "LON", "Router")
+        self.assertEqual(self.server.requests, requests)
+
+    def test_groups_created_from_models_join_the_tree(self):
+        self.acs.load_device_groups()
+        results = list(self.acs.bulk_create_device_groups(
+            [DeviceGroup(name="All Locations:NEW", group_type="Location"),
+             DeviceGroup(name="All Device Types:Router", group_type="Device Type")]))
+        self.assertEqual([r.status for r in results], [201, 201])
+        self.assertIn("All Locations:NEW", self.acs.device_groups)
+        r = self.acs.create_device_simple("LON-1", "s", "10.0.0.1", "NEW", "Router")
+        self.assertEqual(r.status_code, 201)
+
+    def test_bulk_create_groups_reports_bad_records_separately(self):
+        records = [dict(name="D%d" % i, secret="s", ip="10.0.0.%d" % i,
+                        location="EMEA:%s" % ("LON", "PAR")[i % 2], device_type="Router")
+                   for i in range(4)]
+        records.append(dict(name="BAD", secret="s", ip="10.0.1.1",
+                            groups=[{"name": "Bogus:X", "type": "Foo"}]))
+        results = dict((r.record["name"], r) for r in
+                       self.acs.bulk_create_devices(records, create_groups=True))
+        self.assertEqual(sorted(name for name, r in results.items() if r.ok),
+                         ["D0", "D1", "D2", "D3"])
+        self.assertIsNone(results["BAD"].status)
+        self.assertIn("Bogus", results["BAD"].error)
+        self.assertIn("All Locations:EMEA:PAR", self.acs.device_groups)
+        self.assertEqual(self.server.count("NetworkDevice/DeviceGroup"), 6)
+        self.assertEqual(self.server.count("NetworkDevice/Device"), 4)
+
+
+if __name__ == "__main__":
+    unittest.main()
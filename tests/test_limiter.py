@@ -0,0 +1,58 @@
+import threading
+import time
+import unittest
+
+from acsclient.limiter import AdaptiveLimiter
+from acsclient.mockserver import MockACSServer
+
+
+class LimiterTest(unittest.TestCase):
+
+    def setUp(self):
+        self.server = MockACSServer(seed=1).start()
+
+    def tearDown(self):
+        self.server.stop()
+
+    def read(self, acs, count):
+        for _ in range(count):
+            acs.read("Common/AcsVersion")
+
+    def test_limit_shrinks_on_errors_and_grows_back(self):
+        limiter = AdaptiveLimiter(initial=8, tolerance=100)
+        acs = self.server.client(limiter=limiter)
+        self.server.error_rate = 1.0
+        self.read(acs, 10)
+        self.assertEqual(limiter.overloads, 10)
+        self.assertEqual(limiter.limit, 1)
+        self.server.error_rate = 0.0
+        self.read(acs, 20)
+        self.assertEqual(limiter.overloads, 10)
+        self.assertGreater(limiter.limit, 3)
+        self.assertEqual((limiter.completed, limiter.in_flight), (30, 0))
+
+    def test_in_flight_requests_stay_within_the_limit(self):
+        limiter = AdaptiveLimiter(initial=2, max_limit=2)
+        acs = self.server.client(limiter=limiter)
+        self.server.latency = 0.05
+        peak = []
+        acquire = limiter.acquire
+
+        def tracking_acquire():
+            acquire()
+            peak.append(limiter.in_flight)
+        limiter.acquire = tracking_acquire
+
+        threads = [threading.Thread(target=self.read, args=(acs, 2)) for _ in range(6)]
+        start = time.time()
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(len(peak), 12)
+        self.assertEqual(max(peak), 2)
+        self.assertGreaterEqual(time.time() - start, 6 * 0.05)
+
+
+if __name__ == "__main__":
+    unittest.main()
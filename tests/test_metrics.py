@@ -0,0 +1,42 @@
+import unittest
+
+from acsclient.mockserver import MockACSServer
+
+
+class RequestEventTest(unittest.TestCase):
+
+    def setUp(self):
+        self.server = MockACSServer(latency=0.02).start()
+
+    def tearDown(self):
+        self.server.stop()
+
+    def events(self, count, **kwargs):
+        events = []
+        acs = self.server.client(**kwargs)
+        acs.add_hook(events.append)
+        for _ in range(count):
+            acs.read("Common/AcsVersion")
+        return events
+
+    def test_connect_is_timed_apart_from_wait(self):
+        first, second = self.events(2)
+        self.assertGreater(first.connect, 0.0)
+        self.assertEqual(second.connect, 0.0)
+        for event in (first, second):
+            self.assertGreaterEqual(event.wait, 0.02)
+            self.assertLess(event.connect, event.wait)
+
+    def test_every_request_connects_without_keep_alive(self):
+        events = self.events(3, keep_alive=False)
+        self.assertTrue(all(event.connect > 0.0 for event in events))
+
+    def test_connect_histogram(self):
+        acs = self.server.client(metrics=True)
+        acs.read("Common/AcsVersion")
+        self.assertIn('acsclient_connect_duration_seconds_count{method="GET",'
+                      'object_type="Common/AcsVersion"} 1', acs.metrics.to_prometheus())
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,34 @@
+import unittest
+
+from acsclient.mockserver import MockACSServer
+from acsclient.models import Device
+from acsclient.query import Query
+
+
+class MockServerTest(unittest.TestCase):
+
+    def setUp(self):
+        self.server = MockACSServer().start()
+        for i in range(25):
+            self.server.add("NetworkDevice/Device",
+                            Device(name="DEV%02d" % i, tacacs_secret="s"))
+        self.acs = self.server.client()
+
+    def tearDown(self):
+        self.server.stop()
+
+    def names(self, query, page_size):
+        return [e.findtext("name") for e in
+                self.acs.iter_query("NetworkDevice/Device", query, page_size)]
+
+    def test_pages_follow_store_changes(self):
+        query = Query().where("name", "STARTS_WITH", "DEV1")
+        self.assertEqual(self.names(query, 3), ["DEV%02d" % i for i in range(10, 20)])
+        self.acs.delete("NetworkDevice/Device", "name", "DEV12")
+        self.server.add("NetworkDevice/Device", Device(name="DEV1X", tacacs_secret="s"))
+        self.assertEqual(self.names(query, 4),
+                         ["DEV%02d" % i for i in range(10, 20) if i != 12] + ["DEV1X"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,42 @@
+import unittest
+import xml.etree.ElementTree as ET
+
+from acsclient.models import Device, GroupInfo
+
+from fixtures import DEVICE
+
+
+class ModelTest(unittest.TestCase):
+
+    def test_unchanged_object_writes_back_its_source(self):
+        device = Device.from_xml(ET.fromstring(DEVICE))
+        self.assertEqual(device.to_xml(), DEVICE)
+
+    def test_changed_field_keeps_unmodeled_settings(self):
+        device = Device.from_xml(DEVICE)
+        device.description = "edge"
+        device.groups.append(GroupInfo("All Locations:PAR", "Location"))
+        xml = device.to_xml()
+        self.assertIn("<description>edge</description>", xml)
+        self.assertIn("<groupName>All Locations:PAR</groupName>", xml)
+        self.assertIn("<keyEncryptionKey>abc</keyEncryptionKey>", xml)
+        self.assertIn("<authenticationSettings><radius>1</radius>", xml)
+
+    def test_shared_secret_change_keeps_connection_settings(self):
+        device = Device.from_xml(DEVICE)
+        device.radius_secret = "new"
+        xml = device.to_xml()
+        self.assertIn("<sharedSecret>new</sharedSecret>", xml)
+        self.assertIn("<portCoA>3799</portCoA>", xml)
+        self.assertIn("<tacacsConnection><legacyTACACS>false</legacyTACACS>"
+                      "<sharedSecret>t</sharedSecret>", xml)
+
+    def test_without_source(self):
+        device = Device.from_xml(DEVICE, keep_source=False)
+        self.assertIsNone(device._source)
+        self.assertEqual(device, Device.from_xml(DEVICE))
+        self.assertNotIn("keyEncryptionKey", device.to_xml())
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,50 @@
+import unittest
+
+from acsclient.mockserver import MockACSServer
+from acsclient.models import Device
+
+from fixtures import DEVICE
+
+
+class ReconcileTest(unittest.TestCase):
+
+    def setUp(self):
+        self.server = MockACSServer().start()
+        self.server.add("NetworkDevice/Device", DEVICE)
+        self.acs = self.server.client()
+
+    def tearDown(self):
+        self.server.stop()
+
+    def read(self):
+        return self.acs.read("NetworkDevice/Device", "name", "LON-1").content
+
+    def test_partial_update_keeps_the_rest_of_the_device(self):
+        before = self.read()
+        plan = self.acs.reconcile([dict(name="LON-1", description="edge")])
+        self.assertEqual([(a.op, sorted(a.changes)) for a in plan],
+                         [("update", ["description"])])
+        self.assertTrue(all(result.ok for result in plan.results))
+        self.assertEqual(self.read(), before.replace(b"<description>core<",
+                                                     b"<description>edge<"))
+
+    def test_changed_groups_keep_connection_settings(self):
+        self.acs.reconcile([Device(name="LON-1",
+                                   groups=[("All Locations:PAR", "Location")])])
+        device = Device.from_xml(self.read())
+        self.assertEqual([g.name for g in device.groups], ["All Locations:PAR"])
+        self.assertEqual(device.subnets[0].ip, "10.0.0.1")
+        for text in (b"<portCoA>3799</portCoA>", b"<keyWrap>true</keyWrap>",
+                     b"<keyEncryptionKey>abc</keyEncryptionKey>",
+                     b"<legacyTACACS>false</legacyTACACS>",
+                     b"<singleConnect>true</singleConnect>",
+                     b"<authenticationSettings>"):
+            self.assertIn(text, self.read())
+
+    def test_unchanged_device_is_not_written(self):
+        plan = self.acs.reconcile([dict(name="LON-1", description="core")])
+        self.assertEqual(len(plan), 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,62 @@
+import unittest
+
+import requests
+
+from acsclient.mockserver import MockACSServer
+from acsclient.models import Device
+
+
+class RetryTest(unittest.TestCase):
+
+    def setUp(self):
+        self.server = MockACSServer(seed=1).start()
+        self.server.add("NetworkDevice/Device", Device(name="LON-1", tacacs_secret="s"))
+        self.acs = self.server.client(max_retries=2, backoff=0.001)
+
+    def tearDown(self):
+        self.server.stop()
+
+    def requests_for(self, func, *args):
+        before = self.server.requests
+        r = func(*args)
+        return r.status_code, self.server.requests - before
+
+    def test_get_and_put_are_retried(self):
+        self.server.error_rate = 1.0
+        self.assertEqual(self.requests_for(self.acs.read, "NetworkDevice/Device",
+                                           "name", "LON-1"), (500, 3))
+        self.assertEqual(self.requests_for(self.acs.update, "NetworkDevice/Device",
+                                           Device(name="LON-1", tacacs_secret="t")), (500, 3))
+        self.assertEqual(self.acs.retry_count, 4)
+
+    def test_post_is_never_retried(self):
+        self.server.error_rate = 1.0
+        self.assertEqual(self.requests_for(self.acs.create, "NetworkDevice/Device",
+                                           Device(name="PAR-1", tacacs_secret="s")), (500, 1))
+        self.assertEqual(self.acs.retry_count, 0)
+
+    def test_retries_recover_from_transient_errors(self):
+        self.server.error_rate = 0.3
+        acs = self.server.client(max_retries=10, backoff=0.001)
+        before = self.server.requests
+        statuses = [acs.read("NetworkDevice/Device", "name", "LON-1").status_code
+                    for _ in range(20)]
+        self.assertEqual(statuses, [200] * 20)
+        self.assertGreater(acs.retry_count, 0)
+        self.assertEqual(self.server.requests - before, 20 + acs.retry_count)
+
+    def test_retry_after_takes_precedence(self):
+        acs = self.server.client(backoff=0.001, backoff_max=5)
+        r = requests.Response()
+        r.status_code = 503
+        r.headers["Retry-After"] = "2"
+        self.assertEqual(acs._backoff_delay(3, r), 2.0)
+        r.headers["Retry-After"] = "120"
+        self.assertEqual(acs._backoff_delay(0, r), 5)
+        r.headers["Retry-After"] = "Wed, 21 Oct 2026 07:28:00 GMT"
+        self.assertLessEqual(acs._backoff_delay(2, r), 0.004)
+        self.assertLessEqual(acs._backoff_delay(20), 5)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,60 @@
+import threading
+import unittest
+
+import requests
+
+from acsclient.mockserver import MockACSServer
+
+
+class SingleFlightTest(unittest.TestCase):
+
+    callers = 8
+
+    def setUp(self):
+        self.server = MockACSServer(latency=0.3).start()
+
+    def tearDown(self):
+        self.server.stop()
+
+    def concurrent_reads(self, acs):
+        start = threading.Barrier(self.callers)
+        outcomes = [None] * self.callers
+
+        def read(i):
+            start.wait()
+            try:
+                outcomes[i] = acs.read("Common/AcsVersion")
+            except Exception as e:
+                outcomes[i] = e
+
+        threads = [threading.Thread(target=read, args=(i,)) for i in range(self.callers)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        return outcomes
+
+    def test_identical_reads_share_one_request(self):
+        acs = self.server.client(coalesce=True, pool_maxsize=self.callers)
+        outcomes = self.concurrent_reads(acs)
+        self.assertEqual(self.server.requests, 1)
+        self.assertEqual(acs.flights.shared, self.callers - 1)
+        self.assertTrue(all(r is outcomes[0] for r in outcomes))
+        self.assertEqual(outcomes[0].status_code, 200)
+
+    def test_identical_reads_share_the_exception(self):
+        acs = self.server.client(coalesce=True, timeout=0.1)
+        outcomes = self.concurrent_reads(acs)
+        self.assertEqual(self.server.requests, 1)
+        self.assertIsInstance(outcomes[0], requests.Timeout)
+        self.assertTrue(all(e is outcomes[0] for e in outcomes))
+
+    def test_reads_are_not_shared_without_coalesce(self):
+        acs = self.server.client(pool_maxsize=self.callers)
+        outcomes = self.concurrent_reads(acs)
+        self.assertEqual(self.server.requests, self.callers)
+        self.assertEqual(len(set(id(r) for r in outcomes)), self.callers)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,72 @@
+import unittest
+
+from acsclient.mockserver import MockACSServer
+from acsclient.models import Device
+from acsclient.query import Query
+
+from fixtures import DEVICE
+
+
+class WhereTest(unittest.TestCase):
+
+    def setUp(self):
+        self.server = MockACSServer().start()
+        self.server.add("NetworkDevice/Device", DEVICE)
+        for i in range(5):
+            self.server.add("NetworkDevice/Device", Device(
+                name="PAR-%d" % i, tacacs_secret="s",
+                subnets=[("10.1.0.%d" % i, 32)]))
+        self.acs = self.server.client()
+
+    def tearDown(self):
+        self.server.stop()
+
+    def read(self, name):
+        return self.acs.read("NetworkDevice/Device", "name", name).content
+
+    def test_update_where_changes_only_the_given_field(self):
+        before = self.read("LON-1")
+        results = self.acs.update_where("NetworkDevice/Device",
+                                        Query().where("name", "STARTS_WITH", "LON-"),
+                                        {"description": "decom"})
+        self.assertEqual([(r.record.name, r.status) for r in results], [("LON-1", 200)])
+        self.assertEqual(self.read("LON-1"), before.replace(b"<description>core<",
+                                                            b"<description>decom<"))
+
+    def test_update_where_with_callable(self):
+        def change(device):
+            if device.name.endswith("1"):
+                device.description = "one"
+                return device
+        results = self.acs.update_where("NetworkDevice/Device", Query.everything(), change)
+        self.assertEqual(sorted(r.record.name for r in results), ["LON-1", "PAR-1"])
+        self.assertIn(b"<portCoA>3799</portCoA>", self.read("LON-1"))
+        self.assertIn(b"<description>one</description>", self.read("PAR-1"))
+
+    def test_delete_where_dry_run(self):
+        results = self.acs.delete_where("NetworkDevice/Device",
+                                        Query().where("name", "STARTS_WITH", "PAR-"),
+                                        dry_run=True)
+        self.assertEqual(sorted(r.record for r in results),
+                         ["PAR-%d" % i for i in range(5)])
+        self.assertEqual(self.server.count("NetworkDevice/Device"), 6)
+
+    def test_delete_where_max_objects(self):
+        query = Query().where("name", "STARTS_WITH", "PAR-")
+        with self.assertRaises(ValueError):
+            self.acs.delete_where("NetworkDevice/Device", query, max_objects=4)
+        self.assertEqual(self.server.count("NetworkDevice/Device"), 6)
+        results = self.acs.delete_where("NetworkDevice/Device", query, max_objects=5)
+        self.assertTrue(all(r.ok for r in results))
+        self.assertEqual(self.server.count("NetworkDevice/Device"), 1)
+
+    def test_delete_where_pages_past_deleted_objects(self):
+        results = self.acs.delete_where("NetworkDevice/Device",
+                                        Query().where("name", "STARTS_WITH", "PAR-"),
+                                        page_size=2)
+        self.assertEqual(len(results), 5)
+        self.assertEqual(self.server.count("NetworkDevice/Device"), 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,56 @@
+import unittest
+
+from acsclient.mockserver import MockACSServer
+from acsclient.models import Device
+
+
+class WriteBehindTest(unittest.TestCase):
+
+    def setUp(self):
+        self.server = MockACSServer().start()
+        self.acs = self.server.client()
+
+    def tearDown(self):
+        self.server.stop()
+
+    def test_pending_writes_are_coalesced(self):
+        errors = []
+        with self.acs.write_behind(interval=60, on_error=errors.append) as queue:
+            futures = [queue.create("NetworkDevice/Device",
+                                    Device(name="LON-1", description="v%d" % i,
+                                           tacacs_secret="s"))
+                       for i in range(3)]
+            missing = queue.update("NetworkDevice/Device",
+                                   Device(name="PAR-1", tacacs_secret="s"))
+        self.assertEqual((queue.enqueued, queue.coalesced, queue.written), (4, 2, 2))
+        result = futures[0].result()
+        self.assertTrue(result.ok)
+        self.assertIs(result.record, futures[2].result().record)
+        self.assertEqual(result.record.description, "v2")
+        self.assertEqual(errors, [missing.result()])
+        self.assertEqual(errors[0].record.name, "PAR-1")
+        self.assertIn(b"<description>v2</description>",
+                      self.acs.read("NetworkDevice/Device", "name", "LON-1").content)
+
+    def test_failing_on_error_does_not_stop_the_queue(self):
+        def on_error(result):
+            raise RuntimeError("callback failed")
+
+        queue = self.acs.write_behind(interval=0.05, on_error=on_error)
+        try:
+            with self.assertLogs("acsclient.writebehind", "ERROR") as logs:
+                failed = [queue.update("NetworkDevice/Device",
+                                       Device(name="MISSING-%d" % i, tacacs_secret="s"))
+                          for i in range(2)]
+                self.assertFalse(any(f.result(timeout=5).ok for f in failed))
+            self.assertEqual(len(logs.records), 2)
+            later = queue.create("NetworkDevice/Device",
+                                 Device(name="LON-2", tacacs_secret="s"))
+            self.assertTrue(later.result(timeout=5).ok)
+        finally:
+            queue.close()
+        self.assertEqual(queue.failed, 2)
+
+
+if __name__ == "__main__":
+    unittest.main()